@@ -86,6 +86,7 @@ router.post('/:mineId', async (req, res) => {
     const mlResponse = await axios.post(`${ML_SERVICE_URL}/api/forecast`, {
       emissions: serializedEmissions,
       horizon,
+      mine_id: mineId,
     }, {
       timeout: 120000, // 120 second timeout for ML processing (ARIMA fitting can be slow)
       headers: { 'Content-Type': 'application/json' },
@@ -52,6 +52,7 @@ router.get('/:mineId', async (req, res) => {
       const mlResponse = await axios.post(`${ML_SERVICE_URL}/api/forecast/insights`, {
         emissions: serializedEmissions,
         forecast_data: cached ? cached.forecast_data : [],
+        mine_id: mineId,
       }, { timeout: 30000 });
 
       if (mlResponse.data.success) {
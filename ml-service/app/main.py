@@ -10,11 +10,15 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Load .env before importing the routes: the services they import read
+# settings such as ORDER_FULL_SEARCH_INTERVAL at import time
+load_dotenv()
+
 from app.routes.forecast import forecast_bp
 from app.routes.insights import insights_bp
+from app.routes.debug import debug_bp
 from app.utils.logger import get_logger
 
-load_dotenv()
 logger = get_logger(__name__)
 
 
@@ -26,6 +30,7 @@ def create_app() -> Flask:
     # Register blueprints
     app.register_blueprint(forecast_bp)
     app.register_blueprint(insights_bp)
+    app.register_blueprint(debug_bp)
 
     # Health check endpoint
     @app.route("/health", methods=["GET"])
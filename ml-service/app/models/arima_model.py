@@ -5,9 +5,11 @@ Uses statsmodels ARIMA implementation with automatic order selection
 based on AIC (Akaike Information Criterion).
 """
 
+import time
 import warnings
 import numpy as np
 import pandas as pd
+from scipy.stats import norm
 from statsmodels.tsa.arima.model import ARIMA
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
@@ -28,18 +30,41 @@ class ARIMAForecaster:
         (1, 2, 1), (0, 2, 1),
     ]
 
-    def __init__(self):
+    # Residual degrees of freedom required beyond the parameter count
+    MIN_DEGREES_OF_FREEDOM = 10
+
+    def __init__(self, candidate_orders: list = None, start_params: dict = None):
+        self.candidate_orders = (
+            [tuple(o) for o in candidate_orders] if candidate_orders else list(self.CANDIDATE_ORDERS)
+        )
+        # Optimizer starting values per order, e.g. yesterday's estimates for
+        # the same mine. Updated with every successful fit.
+        self.start_params = {
+            tuple(order): np.asarray(params, dtype=float)
+            for order, params in (start_params or {}).items()
+        }
+        self.fit_stats = {}
         self.model = None
         self.fitted_model = None
         self.order = None
         self.aic = None
         self.data = None
         self.trend_param = None
+        self.candidates_fitted = 0
+        self.candidates_failed = 0
+        self.used_fallback = False
+        self.skipped_candidates = []
+        self.failed_candidates = []
 
     def fit(self, data: pd.Series) -> dict:
         """
         Fit the ARIMA model with automatic order selection.
 
+        Candidates are tried in the order of ``self.candidate_orders``.
+        Candidates that cannot succeed on this data (see
+        ``candidate_skip_reason``) are skipped without fitting; skips and
+        fit failures are recorded for ``get_diagnostics``.
+
         Args:
             data: pd.Series of emission values indexed by date.
 
@@ -52,35 +77,45 @@ class ARIMAForecaster:
         best_order = (1, 1, 1)  # fallback
         best_model = None
         best_trend = None
+        self.candidates_fitted = 0
+        self.candidates_failed = 0
+        self.used_fallback = False
+        self.skipped_candidates = []
+        self.failed_candidates = []
+        self.fit_stats = {"fits": 0, "warm_started_fits": 0, "iterations": 0, "fit_time_ms": 0.0}
+        values = np.asarray(data, dtype=float)
 
-        for order in self.CANDIDATE_ORDERS:
+        for order in self.candidate_orders:
+            trend = candidate_trend(order)
+            reason = candidate_skip_reason(values, order, trend, self.MIN_DEGREES_OF_FREEDOM)
+            if reason:
+                self.skipped_candidates.append({"order": list(order), "reason": reason})
+                continue
+
+            self.candidates_fitted += 1
             try:
-                # trend parameter is CRITICAL for producing sloped forecasts:
-                # d=0: 'ct' = constant + linear time trend (captures level & slope)
-                # d=1: 'c'  = constant/drift (produces sloped forecast line)
-                # d=2: 'c'  = constant/drift
-                # Without drift ('c'), d>=1 forecasts converge to FLAT lines!
-                if order[1] == 0:
-                    trend = 'ct'
-                else:
-                    trend = 'c'
-                model = ARIMA(data, order=order, trend=trend)
-                fitted = model.fit()
+                fitted = self._fit_arima(data, order, trend, self.fit_stats)
                 if fitted.aic < best_aic:
                     best_aic = fitted.aic
                     best_order = order
                     best_model = fitted
                     best_trend = trend
-            except Exception:
+            except Exception as e:
+                self.candidates_failed += 1
+                self.failed_candidates.append({"order": list(order), "error": str(e)[:200]})
                 continue
 
         if best_model is None:
-            # Final fallback: simple (1,1,1) WITH drift
-            model = ARIMA(data, order=(1, 1, 1), trend='c')
-            best_model = model.fit()
+            self.used_fallback = True
+            if np.ptp(values) == 0:
+                # Constant series: the mean model is exact
+                best_order, best_trend = (0, 0, 0), 'c'
+            else:
+                # Final fallback: simple (1,1,1) WITH drift
+                best_order = (1, 1, 1)
+                best_trend = candidate_trend(best_order)
+            best_model = self._fit_arima(data, best_order, best_trend, self.fit_stats)
             best_aic = best_model.aic
-            best_order = (1, 1, 1)
-            best_trend = 'c'
 
         self.fitted_model = best_model
         self.order = best_order
@@ -89,40 +124,109 @@ class ARIMAForecaster:
 
         return {"order": list(best_order), "aic": round(best_aic, 2)}
 
-    def predict(self, horizon: int) -> dict:
+    def _fit_arima(self, data: pd.Series, order: tuple, trend: str, stats: dict):
+        """
+        Fit one ARIMA model, starting the optimizer from stored parameters
+        for this order when available, and accumulate timing into ``stats``.
+        """
+        model = ARIMA(data, order=order, trend=trend)
+        start = self.start_params.get(tuple(order))
+        warm = start is not None and len(start) == len(model.param_names)
+
+        t0 = time.perf_counter()
+        fitted = None
+        if warm:
+            try:
+                fitted = model.fit(start_params=start)
+            except Exception:
+                warm = False
+        if fitted is None:
+            fitted = model.fit()
+        elapsed = time.perf_counter() - t0
+
+        retvals = fitted.mle_retvals or {}
+        stats["fits"] += 1
+        stats["warm_started_fits"] += int(warm)
+        stats["iterations"] += int(retvals.get("iterations", 0))
+        stats["fit_time_ms"] += elapsed * 1000
+
+        self.start_params[tuple(order)] = np.asarray(fitted.params, dtype=float)
+        return fitted
+
+    def predict(self, horizon: int, levels: list = None) -> dict:
         """
         Generate forecast for the given horizon.
 
+        The forecast standard errors are computed once and every requested
+        confidence level is derived from them with normal quantiles.
+
         Args:
             horizon: Number of days to forecast (7, 14, or 30).
+            levels: Confidence levels in percent (e.g. [50, 80, 95]).
+                The 95% band is always returned as the confidence bounds.
 
         Returns:
             dict with 'forecast', 'confidence_lower', 'confidence_upper'
-            as lists of floats, and 'dates' as list of date strings.
+            as lists of floats, 'dates' as list of date strings, and
+            'intervals' mapping each level (e.g. "80") to its
+            {'lower', 'upper'} lists.
+        """
+        predicted_mean, std_error = self.forecast_distribution(horizon)
+        first_date = self.data.index[-1] + pd.Timedelta(days=1)
+        return build_prediction(predicted_mean, std_error, first_date, levels)
+
+    def forecast_distribution(self, horizon: int) -> tuple:
+        """
+        Return the raw forecast mean and standard error arrays.
+
+        Args:
+            horizon: Number of steps to forecast.
+
+        Returns:
+            (predicted_mean, std_error) as float arrays of length horizon.
         """
         if self.fitted_model is None:
             raise ValueError("Model has not been fitted. Call fit() first.")
 
         forecast_result = self.fitted_model.get_forecast(steps=horizon)
-        predicted_mean = forecast_result.predicted_mean
-        confidence_int = forecast_result.conf_int(alpha=0.05)
+        predicted_mean = np.asarray(forecast_result.predicted_mean, dtype=float)
+        std_error = np.asarray(forecast_result.se_mean, dtype=float)
+        return predicted_mean, std_error
 
-        # Generate forecast dates
-        last_date = self.data.index[-1]
-        forecast_dates = pd.date_range(
-            start=last_date + pd.Timedelta(days=1), periods=horizon, freq="D"
-        )
+    def forecast_covariance(self, horizon: int) -> np.ndarray:
+        """
+        Return the covariance matrix of the forecast errors across steps.
 
-        return {
-            "dates": [d.strftime("%Y-%m-%d") for d in forecast_dates],
-            "forecast": [max(0, round(float(v), 2)) for v in predicted_mean],
-            "confidence_lower": [
-                max(0, round(float(v), 2)) for v in confidence_int.iloc[:, 0]
-            ],
-            "confidence_upper": [
-                max(0, round(float(v), 2)) for v in confidence_int.iloc[:, 1]
-            ],
-        }
+        Propagates the state covariance after the last observation through
+        the model's state-space form: for steps i <= k,
+        Cov(e_i, e_k) = Z T^(k-i) P_i Z'. The diagonal equals the squared
+        standard errors of ``forecast_distribution``.
+
+        Args:
+            horizon: Number of steps to forecast.
+
+        Returns:
+            (horizon, horizon) float array.
+        """
+        if self.fitted_model is None:
+            raise ValueError("Model has not been fitted. Call fit() first.")
+
+        ssm = self.fitted_model.filter_results
+        transition = ssm.transition[:, :, 0]
+        design = ssm.design[:, :, 0]
+        selection = ssm.selection[:, :, 0]
+        state_noise = selection @ ssm.state_cov[:, :, 0] @ selection.T
+        state_cov = ssm.predicted_state_cov[:, :, -1]
+
+        covariance = np.zeros((horizon, horizon))
+        for i in range(horizon):
+            cross = state_cov
+            for k in range(i, horizon):
+                covariance[i, k] = covariance[k, i] = float((design @ cross @ design.T)[0, 0])
+                cross = transition @ cross
+            covariance[i, i] += float(ssm.obs_cov[0, 0, 0])
+            state_cov = transition @ state_cov @ transition.T + state_noise
+        return covariance
 
     def evaluate(self, test_ratio: float = 0.2) -> dict:
         """
@@ -145,8 +249,14 @@ class ARIMAForecaster:
             return {"mae": 0.0, "rmse": 0.0}
 
         try:
-            model = ARIMA(train, order=self.order, trend=self.trend_param)
-            fitted = model.fit()
+            # The full-data estimates are a close starting point for the
+            # training slice; keep them so evaluation doesn't overwrite them
+            full_params = self.start_params.get(tuple(self.order))
+            stats = {"fits": 0, "warm_started_fits": 0, "iterations": 0, "fit_time_ms": 0.0}
+            fitted = self._fit_arima(train, self.order, self.trend_param, stats)
+            if full_params is not None:
+                self.start_params[tuple(self.order)] = full_params
+            self.fit_stats["evaluate"] = stats
             predictions = fitted.forecast(steps=len(test))
 
             mae = mean_absolute_error(test, predictions)
@@ -156,9 +266,124 @@ class ARIMAForecaster:
         except Exception:
             return {"mae": 0.0, "rmse": 0.0}
 
+    def get_diagnostics(self) -> dict:
+        """Return the candidates skipped by pre-checks and those whose fit raised."""
+        return {
+            "skipped_candidates": self.skipped_candidates,
+            "failed_candidates": self.failed_candidates,
+            "used_fallback": self.used_fallback,
+        }
+
+    def get_fit_stats(self) -> dict:
+        """Return optimizer iteration counts and fit times of the last fit/evaluate."""
+        stats = {k: v for k, v in self.fit_stats.items() if k != "evaluate"}
+        result = {**stats, "fit_time_ms": round(stats.get("fit_time_ms", 0.0), 1)}
+        if "evaluate" in self.fit_stats:
+            evaluate = self.fit_stats["evaluate"]
+            result["evaluate"] = {**evaluate, "fit_time_ms": round(evaluate["fit_time_ms"], 1)}
+        return result
+
     def get_model_params(self) -> dict:
         """Return the fitted model parameters."""
         return {
             "order": list(self.order) if self.order else None,
             "aic": round(self.aic, 2) if self.aic else None,
         }
+
+
+def build_prediction(predicted_mean: np.ndarray, std_error: np.ndarray, first_date, levels: list = None) -> dict:
+    """
+    Format a daily forecast distribution as clipped, rounded bands.
+
+    Args:
+        predicted_mean: Forecast mean per day.
+        std_error: Forecast standard error per day.
+        first_date: Date of the first forecast day.
+        levels: Confidence levels in percent; 95 is always included.
+
+    Returns:
+        dict in the ARIMAForecaster.predict format.
+    """
+    levels = list(levels) if levels else [95]
+    if 95 not in levels:
+        levels.append(95)
+
+    # One column per level: z-scores of the two-sided intervals
+    z = norm.ppf(0.5 + np.asarray(levels, dtype=float) / 200)
+    half_width = std_error[:, None] * z[None, :]
+    lower = np.round(np.maximum(predicted_mean[:, None] - half_width, 0), 2)
+    upper = np.round(np.maximum(predicted_mean[:, None] + half_width, 0), 2)
+
+    intervals = {
+        f"{level:g}": {"lower": lower[:, i].tolist(), "upper": upper[:, i].tolist()}
+        for i, level in enumerate(levels)
+    }
+
+    forecast_dates = pd.date_range(start=first_date, periods=len(predicted_mean), freq="D")
+
+    return {
+        "dates": forecast_dates.strftime("%Y-%m-%d").tolist(),
+        "forecast": np.round(np.maximum(predicted_mean, 0), 2).tolist(),
+        "confidence_lower": intervals["95"]["lower"],
+        "confidence_upper": intervals["95"]["upper"],
+        "intervals": intervals,
+    }
+
+
+def candidate_trend(order: tuple) -> str:
+    """
+    statsmodels trend specification for a candidate order.
+
+    The trend is CRITICAL for producing sloped forecasts. statsmodels
+    applies it to the undifferenced series, so it may only contain terms
+    that survive differencing d times:
+        d=0: 'ct' = constant + linear time trend (captures level & slope)
+        d=1: 't'  = linear time trend, i.e. drift in the differenced series
+        d=2: 'n'  = none; double differencing already extrapolates the slope
+    Without drift, d=1 forecasts converge to FLAT lines!
+    """
+    d = order[1]
+    if d == 0:
+        return 'ct'
+    if d == 1:
+        return 't'
+    return 'n'
+
+
+# Number of parameters each statsmodels trend specification adds
+_TREND_PARAMS = {"n": 0, "c": 1, "t": 1, "ct": 2}
+
+
+def candidate_skip_reason(values: np.ndarray, order: tuple, trend: str, min_dof: int = 10):
+    """
+    Cheap checks for an ARIMA candidate that is bound to fail or be meaningless.
+
+    Args:
+        values: Series values as a float array.
+        order: (p, d, q) candidate order.
+        trend: statsmodels trend specification for the candidate.
+        min_dof: Residual degrees of freedom required beyond the parameters.
+
+    Returns:
+        Reason string if the candidate should be skipped, otherwise None.
+    """
+    p, d, q = order
+
+    if np.ptp(values) == 0:
+        return "constant series"
+
+    n_effective = len(values) - d
+    n_params = p + q + _TREND_PARAMS.get(trend, 0) + 1  # + noise variance
+    if n_effective < n_params + min_dof:
+        return (
+            f"{n_effective} observations after differencing, need at least "
+            f"{n_params + min_dof} for {n_params} parameters"
+        )
+
+    if d > 0:
+        differenced = np.diff(values, n=d)
+        scale = max(float(np.abs(values).max()), 1.0)
+        if float(np.std(differenced)) <= 1e-10 * scale:
+            return f"series is constant after differencing {d} time(s)"
+
+    return None
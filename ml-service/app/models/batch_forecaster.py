@@ -0,0 +1,284 @@
+"""
+Batched forecaster for many aligned emission series at once.
+
+Fits simple models for every series of a (mines x days) matrix with
+vectorized NumPy instead of one statsmodels object per mine:
+
+- AR(p) on the differenced series with drift, estimated by batched least
+  squares, with per-series order selection by AIC.
+- Holt's linear exponential smoothing (ETS(A,A,N)), with smoothing
+  parameters chosen per series from a small grid by one-step SSE.
+
+Also provides the insights statistics (rolling anomalies and recent trend)
+for the whole matrix in one pass.
+"""
+
+import numpy as np
+from scipy.stats import norm
+
+
+class BatchForecaster:
+    """Vectorized AR / Holt forecaster over a 2-D array of aligned series."""
+
+    METHODS = ("ar", "ets")
+
+    # Smoothing parameter grid for Holt's method (beta is the trend gain,
+    # which must not exceed alpha for a stable recursion)
+    ETS_ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+    ETS_BETAS = (0.01, 0.05, 0.1, 0.2)
+
+    def __init__(self, method: str = "ar", max_lag: int = 7):
+        if method not in self.METHODS:
+            raise ValueError(f"Method must be one of {', '.join(self.METHODS)}.")
+        if max_lag < 1:
+            raise ValueError("max_lag must be at least 1.")
+
+        self.method = method
+        self.max_lag = max_lag
+        self.data = None
+
+        # AR state
+        self.coefs = None       # (n_series, max_lag) AR coefficients, zero-padded
+        self.intercepts = None  # (n_series,) drift of the differenced series
+        self.lags = None        # (n_series,) selected AR order per series
+
+        # ETS state
+        self.alphas = None
+        self.betas = None
+        self.levels = None
+        self.slopes = None
+
+        self.sigma2 = None      # (n_series,) one-step residual variance
+        self.aic = None         # (n_series,) AIC of the selected model
+
+    def fit(self, data: np.ndarray) -> dict:
+        """
+        Fit one model per row of ``data``.
+
+        Args:
+            data: 2-D array of shape (n_series, n_days). Rows must be aligned
+                on the same dates and contain no NaNs.
+
+        Returns:
+            dict with 'method', 'lags' (AR only) and 'aic' per series.
+        """
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2:
+            raise ValueError("Batch data must be a 2-D array of shape (series, days).")
+        if not np.isfinite(data).all():
+            raise ValueError("Batch data must not contain NaN or infinite values.")
+
+        min_length = self.max_lag + 10 if self.method == "ar" else 10
+        if data.shape[1] < min_length:
+            raise ValueError(
+                f"Need at least {min_length} aligned data points per series, "
+                f"got {data.shape[1]}."
+            )
+
+        self.data = data
+        if self.method == "ar":
+            self._fit_ar(data)
+        else:
+            self._fit_ets(data)
+
+        result = {"method": self.method, "aic": np.round(self.aic, 2).tolist()}
+        if self.method == "ar":
+            result["lags"] = self.lags.tolist()
+        return result
+
+    def _fit_ar(self, data: np.ndarray):
+        """Batched least-squares AR(p) with drift on first differences."""
+        diff = np.diff(data, axis=1)
+        n_series, n_diff = diff.shape
+        max_lag = self.max_lag
+
+        # Common estimation sample so AIC is comparable across orders
+        n_obs = n_diff - max_lag
+        target = diff[:, max_lag:]
+        # lagged[:, :, k] holds lag k+1 of the target
+        lagged = np.stack(
+            [diff[:, max_lag - k - 1:n_diff - k - 1] for k in range(max_lag)], axis=2
+        )
+
+        best_aic = np.full(n_series, np.inf)
+        best_coefs = np.zeros((n_series, max_lag))
+        best_intercepts = np.zeros(n_series)
+        best_sigma2 = np.zeros(n_series)
+        best_lags = np.ones(n_series, dtype=int)
+
+        for p in range(1, max_lag + 1):
+            design = np.concatenate(
+                [np.ones((n_series, n_obs, 1)), lagged[:, :, :p]], axis=2
+            )
+            xtx = np.einsum("nti,ntj->nij", design, design)
+            xty = np.einsum("nti,nt->ni", design, target)
+            # Small ridge keeps constant / collinear series solvable
+            xtx += 1e-8 * np.eye(p + 1)
+            beta = np.linalg.solve(xtx, xty[..., None])[..., 0]
+
+            resid = target - np.einsum("nti,ni->nt", design, beta)
+            sigma2 = np.maximum((resid ** 2).mean(axis=1), 1e-12)
+            aic = n_obs * np.log(sigma2) + 2 * (p + 2)
+
+            better = aic < best_aic
+            best_aic = np.where(better, aic, best_aic)
+            best_intercepts = np.where(better, beta[:, 0], best_intercepts)
+            best_sigma2 = np.where(better, sigma2, best_sigma2)
+            best_lags = np.where(better, p, best_lags)
+            padded = np.zeros((n_series, max_lag))
+            padded[:, :p] = beta[:, 1:]
+            best_coefs = np.where(better[:, None], padded, best_coefs)
+
+        self.coefs = best_coefs
+        self.intercepts = best_intercepts
+        self.sigma2 = best_sigma2
+        self.lags = best_lags
+        self.aic = best_aic
+
+    def _fit_ets(self, data: np.ndarray):
+        """Holt's linear method with the parameter grid searched in parallel."""
+        alphas, betas = np.meshgrid(self.ETS_ALPHAS, self.ETS_BETAS, indexing="ij")
+        valid = betas <= alphas
+        alphas = alphas[valid]
+        betas = betas[valid]
+
+        n_series, n_days = data.shape
+        # State arrays have shape (n_series, n_grid)
+        level = np.repeat(data[:, :1], len(alphas), axis=1)
+        slope = np.repeat(data[:, 1:2] - data[:, :1], len(alphas), axis=1)
+        sse = np.zeros_like(level)
+
+        for t in range(1, n_days):
+            error = data[:, t:t + 1] - (level + slope)
+            sse += error ** 2
+            level = level + slope + alphas * error
+            slope = slope + betas * error
+
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n_series)
+        n_obs = n_days - 1
+        sigma2 = np.maximum(sse[rows, best] / n_obs, 1e-12)
+
+        self.alphas = alphas[best]
+        self.betas = betas[best]
+        self.levels = level[rows, best]
+        self.slopes = slope[rows, best]
+        self.sigma2 = sigma2
+        self.aic = n_obs * np.log(sigma2) + 2 * 4
+
+    def predict(self, horizon: int, alpha: float = 0.05) -> dict:
+        """
+        Forecast every series ``horizon`` steps ahead.
+
+        Args:
+            horizon: Number of days to forecast.
+            alpha: Significance level of the prediction interval.
+
+        Returns:
+            dict with 'forecast', 'confidence_lower' and 'confidence_upper'
+            as arrays of shape (n_series, horizon), clipped at zero.
+        """
+        if self.data is None:
+            raise ValueError("Model has not been fitted. Call fit() first.")
+
+        if self.method == "ar":
+            mean, variance = self._predict_ar(horizon)
+        else:
+            mean, variance = self._predict_ets(horizon)
+
+        half_width = norm.ppf(1 - alpha / 2) * np.sqrt(variance)
+        return {
+            "forecast": np.maximum(mean, 0),
+            "confidence_lower": np.maximum(mean - half_width, 0),
+            "confidence_upper": np.maximum(mean + half_width, 0),
+        }
+
+    def _predict_ar(self, horizon: int):
+        max_lag = self.max_lag
+        n_series = self.data.shape[0]
+        diff = np.diff(self.data, axis=1)
+
+        # history[:, 0] is the most recent difference
+        history = diff[:, ::-1][:, :max_lag].copy()
+        diff_forecast = np.empty((n_series, horizon))
+        for h in range(horizon):
+            step = self.intercepts + np.einsum("nk,nk->n", self.coefs, history)
+            diff_forecast[:, h] = step
+            history = np.concatenate([step[:, None], history[:, :-1]], axis=1)
+        mean = self.data[:, -1:] + np.cumsum(diff_forecast, axis=1)
+
+        # psi weights of the AR polynomial, integrated once for the level
+        psi = np.zeros((n_series, horizon))
+        psi[:, 0] = 1.0
+        for j in range(1, horizon):
+            k = min(j, max_lag)
+            psi[:, j] = np.einsum(
+                "nk,nk->n", self.coefs[:, :k], psi[:, j - 1::-1][:, :k]
+            )
+        level_psi = np.cumsum(psi, axis=1)
+        variance = self.sigma2[:, None] * np.cumsum(level_psi ** 2, axis=1)
+        return mean, variance
+
+    def _predict_ets(self, horizon: int):
+        steps = np.arange(1, horizon + 1)
+        mean = self.levels[:, None] + self.slopes[:, None] * steps
+
+        # Var(h) = sigma2 * (1 + sum_{j=1}^{h-1} (alpha + beta * j)^2)
+        gains = self.alphas[:, None] + self.betas[:, None] * steps[:-1]
+        variance = self.sigma2[:, None] * (
+            1 + np.concatenate(
+                [np.zeros((len(self.sigma2), 1)), np.cumsum(gains ** 2, axis=1)], axis=1
+            )
+        )
+        return mean, variance
+
+
+def batch_insights(data: np.ndarray, window: int = 7, trend_days: int = 30) -> dict:
+    """
+    Compute the per-series insights statistics for a (series x days) matrix.
+
+    Mirrors the single-series insights endpoint: a 2-sigma residual test
+    against a rolling mean (min 3 periods) and a least-squares slope over the
+    most recent ``trend_days`` points.
+
+    Returns:
+        dict with 'rolling_mean', 'rolling_std', 'anomalies' (boolean mask),
+        all shaped like ``data``, plus 'trend_slope' per series.
+    """
+    data = np.asarray(data, dtype=float)
+    n_series, n_days = data.shape
+
+    # Rolling sums via cumulative sums; counts handle the warm-up period
+    zeros = np.zeros((n_series, 1))
+    csum = np.concatenate([zeros, np.cumsum(data, axis=1)], axis=1)
+    csq = np.concatenate([zeros, np.cumsum(data ** 2, axis=1)], axis=1)
+    end = np.arange(1, n_days + 1)
+    start = np.maximum(end - window, 0)
+    counts = (end - start).astype(float)
+
+    win_sum = csum[:, end] - csum[:, start]
+    win_sq = csq[:, end] - csq[:, start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling_mean = win_sum / counts
+        rolling_var = (win_sq - win_sum * rolling_mean) / (counts - 1)
+    rolling_std = np.sqrt(np.maximum(rolling_var, 0))
+
+    warm = counts < 3
+    rolling_mean[:, warm] = np.nan
+    rolling_std[:, warm] = np.nan
+
+    threshold = 2 * rolling_std
+    with np.errstate(invalid="ignore"):
+        anomalies = (np.abs(data - rolling_mean) > threshold) & (threshold > 0)
+
+    recent = data[:, -trend_days:]
+    x = np.arange(recent.shape[1], dtype=float)
+    x_centered = x - x.mean()
+    slope = (recent - recent.mean(axis=1, keepdims=True)) @ x_centered / (x_centered @ x_centered)
+
+    return {
+        "rolling_mean": rolling_mean,
+        "rolling_std": rolling_std,
+        "anomalies": anomalies,
+        "trend_slope": slope,
+    }
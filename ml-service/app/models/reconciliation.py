@@ -0,0 +1,80 @@
+"""
+Weekly/daily forecast reconciliation for long histories.
+
+A daily model fitted on a recent window captures short-term dynamics; a
+model fitted on the weekly-mean long history captures the level and trend
+that years of data support. Each forecast week's daily values are shifted
+toward the weekly forecast, weighted by the two models' forecast variances.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def to_weekly(series: pd.Series) -> pd.Series:
+    """
+    Aggregate a daily series to weekly means (weeks ending Sunday).
+
+    Only complete weeks are kept: a partial week at either end would be a
+    biased weekly observation under weekday/weekend seasonality.
+    """
+    weeks = series.resample("W")
+    return weeks.mean()[weeks.count() == 7]
+
+
+def weeks_ahead(daily_dates: pd.DatetimeIndex, last_week_end: pd.Timestamp) -> np.ndarray:
+    """
+    Weekly forecast step of each forecast day.
+
+    0 means the day falls in the last (possibly partial) observed week,
+    1 the first forecast week, and so on.
+    """
+    week_ends = daily_dates + pd.to_timedelta((6 - daily_dates.weekday) % 7, unit="D")
+    return np.asarray((week_ends - last_week_end).days // 7)
+
+
+def reconcile_weekly(daily_mean: np.ndarray, daily_cov: np.ndarray, steps: np.ndarray,
+                     weekly_mean: np.ndarray, weekly_se: np.ndarray, observed: np.ndarray = None) -> tuple:
+    """
+    Shift each forecast week of the daily forecast toward the weekly forecast.
+
+    The daily model's mean for week k covers all of that week's days, so
+    for the first week it includes the days already ``observed``. That week
+    mean moves by w * (weekly_k - daily week mean), with
+    w = var_daily / (var_daily + var_weekly), so the more certain model
+    dominates; the shift is spread over the week's forecast days only.
+    var_daily is the variance of that week mean, i.e. the sum of the
+    week's block of the daily error covariance divided by the number of
+    days squared. Days in an already-complete observed week (step 0) are
+    left unchanged. The caller keeps the daily standard errors as a
+    conservative interval width.
+
+    Args:
+        daily_mean: Daily forecast mean.
+        daily_cov: Covariance matrix of the daily forecast errors.
+        steps: Weekly step of each day (see ``weeks_ahead``).
+        weekly_mean, weekly_se: Weekly forecast for steps 1..len(weekly_mean).
+        observed: Values already observed in the week of step 1.
+
+    Returns:
+        (reconciled daily mean, weight applied per day)
+    """
+    mean = np.array(daily_mean, dtype=float)
+    weights = np.zeros(len(mean))
+    observed = np.asarray(observed if observed is not None else [], dtype=float)
+
+    for step in np.unique(steps[(steps >= 1) & (steps <= len(weekly_mean))]):
+        mask = steps == step
+        known = observed if step == 1 else observed[:0]
+        n_days = mask.sum() + len(known)
+        week_mean = (daily_mean[mask].sum() + known.sum()) / n_days
+
+        var_daily = float(daily_cov[np.ix_(mask, mask)].sum()) / n_days ** 2
+        var_weekly = float(weekly_se[step - 1]) ** 2
+        if var_daily + var_weekly == 0:
+            continue
+        weight = var_daily / (var_daily + var_weekly)
+        mean[mask] += weight * (weekly_mean[step - 1] - week_mean) * n_days / mask.sum()
+        weights[mask] = weight
+
+    return mean, weights
@@ -0,0 +1,43 @@
+"""
+Debug API route blueprint.
+
+GET /debug/profiles      — Summaries of the captured request profiles.
+GET /debug/profiles/<id> — Full cProfile report of one request.
+
+Both return 404 unless PROFILING_ENABLED is set. Profiles are kept per
+worker process: with several gunicorn workers a lookup only sees the
+profiles of the worker that serves it (compare ``worker_pid`` with the
+``X-Profile-Worker`` header of the profiled response), so run a single
+worker when collecting profiles.
+"""
+
+import os
+
+from flask import Blueprint, jsonify
+
+from app.utils.profiler import profile_store
+
+debug_bp = Blueprint("debug", __name__)
+
+
+@debug_bp.route("/debug/profiles", methods=["GET"])
+def list_profiles():
+    """List the most recent profiles, newest first."""
+    if not profile_store.enabled:
+        return jsonify({"success": False, "error": "Profiling is disabled."}), 404
+    return jsonify({"success": True, "worker_pid": os.getpid(), "profiles": profile_store.list()})
+
+
+@debug_bp.route("/debug/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    """Return one profile including its cumulative-time report."""
+    if not profile_store.enabled:
+        return jsonify({"success": False, "error": "Profiling is disabled."}), 404
+
+    entry = profile_store.get(profile_id)
+    if entry is None:
+        return jsonify({
+            "success": False,
+            "error": f"Profile '{profile_id}' not found in worker {os.getpid()}; profiles are stored per worker.",
+        }), 404
+    return jsonify({"success": True, "profile": entry})
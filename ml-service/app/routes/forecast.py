@@ -2,18 +2,27 @@
 Forecast API route blueprint.
 
 POST /api/forecast — Accepts emission data and returns ARIMA forecast.
+POST /api/forecast/batch — Vectorized forecasts for many mines at once.
+GET  /api/forecast/order-stats — Order-search warm-start statistics.
 """
 
 from flask import Blueprint, request, jsonify
-from app.services.forecast_service import generate_forecast
-from app.utils.validators import validate_forecast_request
+from app.services.forecast_service import (
+    generate_forecast, generate_batch_forecast, order_history, weekly_order_history,
+)
+from app.utils.validators import (
+    validate_forecast_request, validate_forecast_params, validate_batch_forecast_request,
+)
+from app.utils.ndjson_stream import is_ndjson, read_emission_stream
 from app.utils.logger import get_logger
+from app.utils.profiler import profiled
 
 logger = get_logger(__name__)
 forecast_bp = Blueprint("forecast", __name__)
 
 
 @forecast_bp.route("/api/forecast", methods=["POST"])
+@profiled("forecast")
 def create_forecast():
     """
     Generate ARIMA forecast from emission data.
@@ -24,7 +33,15 @@ def create_forecast():
                 {"date": "2025-01-01", "total_carbon_emission": 1234.5, ...},
                 ...
             ],
-            "horizon": 7  // optional, default 7. Must be 7, 14, or 30.
+            "horizon": 7,  // optional, default 7. Must be 7, 14, or 30.
+            "mine_id": "abc123",  // optional; enables warm-started order search
+            "levels": [50, 80, 95],  // optional; extra prediction-interval bands
+            "history_policy": {      // optional; how much history to fit on
+                "mode": "hierarchical",  // "full" (default), "lookback" or "hierarchical"
+                "max_lookback_days": 730,
+                "recent_days": 180,
+                "compare": false         // true: backtest against a full-history fit
+            }
         }
 
     Response:
@@ -35,33 +52,63 @@ def create_forecast():
                 ...
             ],
             "model_accuracy": {"mae": 45.2, "rmse": 62.1},
-            "model_params": {"order": [1, 1, 1], "aic": 1234.56},
-            "data_points_used": 90
+            "model_params": {"order": [1, 1, 1], "aic": 1234.56,
+                             "search": {"mode": "warm", "candidates_fitted": 4}},
+            "data_points_used": 90,
+            "history": {"mode": "full", "points_available": 90, "points_used": 90, "fit_time_ms": 412.5},
+            "diagnostics": {
+                "skipped_candidates": [{"order": [1, 1, 0], "reason": "..."}],
+                "failed_candidates": [],
+                "used_fallback": false
+            },
+            "intervals": {"50": {"lower": [...], "upper": [...]}, ...}  // only with levels
         }
+
+    Large histories can instead be streamed as NDJSON (Content-Type
+    application/x-ndjson): an optional first line {"params": {"horizon": 7, ...}}
+    followed by one emission record per line. Records are validated while
+    parsing, so a bad line is rejected with a 400 naming its line number.
     """
     try:
-        data = request.get_json(force=True)
+        if is_ndjson(request.content_type):
+            # Parameters and every record are validated while streaming
+            data = read_emission_stream(
+                request.stream, request.content_length, validate_params=validate_forecast_params
+            )
+        else:
+            data = request.get_json(force=True)
 
-        # Validate input
-        is_valid, error_msg = validate_forecast_request(data)
-        if not is_valid:
-            return jsonify({"success": False, "error": error_msg}), 400
+            # Validate input
+            is_valid, error_msg = validate_forecast_request(data)
+            if not is_valid:
+                return jsonify({"success": False, "error": error_msg}), 400
 
         emissions = data["emissions"]
         horizon = data.get("horizon", 7)
+        mine_id = data.get("mine_id")
 
         logger.info(f"Forecast request: {len(emissions)} records, horizon={horizon}")
 
         # Generate forecast
-        result = generate_forecast(emissions, horizon)
+        result = generate_forecast(
+            emissions, horizon,
+            series_id=str(mine_id) if mine_id else None,
+            levels=data.get("levels"),
+            history_policy=data.get("history_policy"),
+        )
 
-        return jsonify({
+        response = {
             "success": True,
             "forecast_data": result["forecast_data"],
             "model_accuracy": result["model_accuracy"],
             "model_params": result["model_params"],
             "data_points_used": result["data_points_used"],
-        })
+            "history": result["history"],
+            "diagnostics": result["diagnostics"],
+        }
+        if "intervals" in result:
+            response["intervals"] = result["intervals"]
+        return jsonify(response)
 
     except ValueError as e:
         logger.warning(f"Validation error: {str(e)}")
@@ -70,3 +117,82 @@ def create_forecast():
     except Exception as e:
         logger.error(f"Forecast error: {str(e)}", exc_info=True)
         return jsonify({"success": False, "error": "Internal server error during forecasting."}), 500
+
+
+@forecast_bp.route("/api/forecast/batch", methods=["POST"])
+@profiled("forecast_batch")
+def create_batch_forecast():
+    """
+    Generate forecasts for many mines in one vectorized pass.
+
+    Request body:
+        {
+            "mines": {
+                "<mine_id>": [{"date": "2025-01-01", "total_carbon_emission": 1234.5}, ...],
+                ...
+            },
+            "horizon": 7,    // optional, default 7. Must be 7, 14, or 30.
+            "method": "ar"   // optional, "ar" (default) or "ets"
+        }
+
+    Response:
+        {
+            "success": true,
+            "forecasts": {
+                "<mine_id>": {
+                    "forecast_data": [{"date": ..., "predicted": ..., "upper_bound": ..., "lower_bound": ...}],
+                    "model_params": {"aic": 812.3, "lags": 2},
+                    "trend_slope": 1.25,
+                    "anomalies": [{"date": ..., "value": ..., "expected": ..., "deviation": ..., "severity": ...}],
+                    "data_points_used": 90
+                },
+                ...
+            },
+            "errors": {"<mine_id>": "History ends on 2025-03-20, before the batch end date 2025-03-31."},
+            "method": "ar"
+        }
+    """
+    try:
+        data = request.get_json(force=True)
+
+        is_valid, error_msg = validate_batch_forecast_request(data)
+        if not is_valid:
+            return jsonify({"success": False, "error": error_msg}), 400
+
+        horizon = data.get("horizon", 7)
+        method = data.get("method", "ar")
+
+        logger.info(f"Batch forecast request: {len(data['mines'])} mines, horizon={horizon}, method={method}")
+
+        result = generate_batch_forecast(data["mines"], horizon, method)
+
+        return jsonify({"success": True, **result})
+
+    except ValueError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    except Exception as e:
+        logger.error(f"Batch forecast error: {str(e)}", exc_info=True)
+        return jsonify({"success": False, "error": "Internal server error during batch forecasting."}), 500
+
+
+@forecast_bp.route("/api/forecast/order-stats", methods=["GET"])
+def get_order_stats():
+    """
+    Report how often remembered ARIMA orders were reused.
+
+    Response:
+        {
+            "success": true,
+            "searches": 30, "full_searches": 5, "warm_searches": 25,
+            "fits_performed": 140, "fits_avoided": 160,
+            "order_repeats": 26, "order_changes": 2, "order_stability": 0.9286,
+            "series_tracked": 3,
+            "series": {"<mine_id>": {"last_order": [1, 1, 1], "searches": 10, ...}},
+            "weekly": {"searches": 4, ...}  // weekly models of the hierarchical history policy
+        }
+
+    The top-level figures cover the daily models only.
+    """
+    return jsonify({"success": True, **order_history.stats(), "weekly": weekly_order_history.stats()})
@@ -9,13 +9,26 @@ import pandas as pd
 import numpy as np
 
 
+def emission_frame(raw_emissions) -> pd.DataFrame:
+    """
+    Build a DataFrame from emission records.
+
+    Accepts the JSON list of record dicts or column buffers parsed from an
+    NDJSON upload (anything with a ``to_frame`` method).
+    """
+    if hasattr(raw_emissions, "to_frame"):
+        return raw_emissions.to_frame()
+    return pd.DataFrame(raw_emissions)
+
+
 def process_emission_data(raw_emissions: list) -> pd.Series:
     """
     Process raw emission JSON records into a clean time-series.
 
     Args:
         raw_emissions: List of emission dicts, each with at least
-            'date' (ISO string) and 'total_carbon_emission' (number).
+            'date' (ISO string) and 'total_carbon_emission' (number),
+            or EmissionColumns parsed from an NDJSON upload.
 
     Returns:
         pd.Series of total_carbon_emission indexed by DatetimeIndex,
@@ -27,7 +40,7 @@ def process_emission_data(raw_emissions: list) -> pd.Series:
     if not raw_emissions:
         raise ValueError("No emission data provided.")
 
-    df = pd.DataFrame(raw_emissions)
+    df = emission_frame(raw_emissions)
 
     # Validate required columns
     if "date" not in df.columns or "total_carbon_emission" not in df.columns:
@@ -2,27 +2,242 @@
 Forecast service orchestrating data processing, model training, and prediction.
 """
 
-from app.models.arima_model import ARIMAForecaster
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.models.arima_model import ARIMAForecaster, build_prediction
+from app.models.batch_forecaster import BatchForecaster, batch_insights
+from app.models.reconciliation import reconcile_weekly, to_weekly, weeks_ahead
 from app.services.data_processor import process_emission_data, validate_minimum_data
+from app.services.order_history import OrderHistory
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Orders chosen per series identity; lets daily refreshes skip most of the grid
+order_history = OrderHistory(
+    full_search_interval=int(os.getenv("ORDER_FULL_SEARCH_INTERVAL", 7)),
+)
+# Weekly models of the hierarchical history policy, kept apart so they do
+# not skew the daily statistics
+weekly_order_history = OrderHistory(
+    full_search_interval=int(os.getenv("ORDER_FULL_SEARCH_INTERVAL", 7)),
+)
+
+HISTORY_MODES = ("full", "lookback", "hierarchical")
+
+# Weekly series shorter than this are not worth a long-history model
+MIN_WEEKLY_POINTS = 26
+
+
+def resolve_history_policy(policy: dict = None) -> dict:
+    """
+    Fill a history policy with defaults from the environment and validate it.
+
+    Modes:
+        full: fit on the whole history (default).
+        lookback: fit on the last ``max_lookback_days`` days only.
+        hierarchical: fit a daily model on the last ``recent_days`` days and a
+            weekly-mean model on the last ``max_lookback_days`` days, then
+            reconcile the two.
+
+    Raises:
+        ValueError: If the policy is invalid.
+    """
+    policy = dict(policy or {})
+    resolved = {
+        "mode": policy.get("mode", os.getenv("HISTORY_POLICY_MODE", "full")),
+        "max_lookback_days": policy.get("max_lookback_days", int(os.getenv("HISTORY_MAX_LOOKBACK_DAYS", 730))),
+        "recent_days": policy.get("recent_days", int(os.getenv("HISTORY_RECENT_DAYS", 180))),
+        "compare": bool(policy.get("compare", False)),
+    }
+
+    if resolved["mode"] not in HISTORY_MODES:
+        raise ValueError(f"History mode must be one of: {', '.join(HISTORY_MODES)}.")
+    for key in ("max_lookback_days", "recent_days"):
+        value = resolved[key]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 30:
+            raise ValueError(f"'{key}' must be an integer of at least 30 days.")
+    if resolved["mode"] == "hierarchical" and resolved["recent_days"] > resolved["max_lookback_days"]:
+        raise ValueError("'recent_days' cannot exceed 'max_lookback_days'.")
+
+    return resolved
+
+
+def _fit_forecaster(series, series_id: str = None, history: OrderHistory = order_history) -> tuple:
+    """
+    Fit an ARIMAForecaster, warm-starting the order search if the series is
+    known to ``history``.
+
+    Returns:
+        (forecaster, model_params, search_mode, fits_performed)
+    """
+    grid = ARIMAForecaster.CANDIDATE_ORDERS
+    search_mode = "full"
+    if series_id is not None:
+        candidates, search_mode = history.candidates_for(series_id, grid)
+        start_params = history.start_params_for(series_id)
+        forecaster = ARIMAForecaster(candidate_orders=candidates, start_params=start_params)
+    else:
+        forecaster = ARIMAForecaster()
+    model_params = forecaster.fit(series)
+    fits_performed = forecaster.candidates_fitted
+
+    if search_mode == "warm" and forecaster.used_fallback:
+        # Every remembered order failed on today's data — search the full grid
+        logger.info(f"Warm order search failed for {series_id}, falling back to full grid")
+        search_mode = "full"
+        forecaster = ARIMAForecaster(start_params=forecaster.start_params)
+        model_params = forecaster.fit(series)
+        fits_performed += forecaster.candidates_fitted
 
-def generate_forecast(emissions: list, horizon: int = 7) -> dict:
+    model_params["search"] = {"mode": search_mode, "candidates_fitted": fits_performed}
+    if forecaster.skipped_candidates:
+        logger.info(f"Skipped {len(forecaster.skipped_candidates)} candidate orders by pre-checks")
+    return forecaster, model_params, search_mode, fits_performed
+
+
+def _record_search(history: OrderHistory, series_id: str, forecaster: ARIMAForecaster,
+                   search_mode: str, fits_performed: int):
+    if series_id is not None:
+        history.record(
+            series_id, forecaster.order, search_mode, fits_performed,
+            len(ARIMAForecaster.CANDIDATE_ORDERS), params=forecaster.start_params,
+        )
+
+
+def _policy_forecast(series, horizon: int, policy: dict, series_id: str = None) -> dict:
+    """
+    Fit the models a history policy calls for and forecast ``horizon`` days.
+
+    Returns:
+        dict with 'forecaster' (daily model), 'fit_series', 'mean', 'std_error',
+        'history' (report) and 'searches'
+        [(order history, series_id, forecaster, mode, fits)].
+    """
+    t0 = time.perf_counter()
+    mode = policy["mode"]
+    if mode == "lookback":
+        fit_series = series.iloc[-policy["max_lookback_days"]:]
+    elif mode == "hierarchical":
+        fit_series = series.iloc[-policy["recent_days"]:]
+    else:
+        fit_series = series
+
+    forecaster, model_params, search_mode, fits = _fit_forecaster(fit_series, series_id)
+    searches = [(order_history, series_id, forecaster, search_mode, fits)]
+    mean, std_error = forecaster.forecast_distribution(horizon)
+
+    history = {
+        "mode": mode,
+        "points_available": len(series),
+        "points_used": len(fit_series),
+    }
+
+    if mode == "hierarchical":
+        long_history = series.iloc[-policy["max_lookback_days"]:]
+        weekly = to_weekly(long_history)
+        history["weekly_points"] = len(weekly)
+        if len(long_history) <= len(fit_series):
+            history["reconciliation"] = "skipped: no history beyond the recent window"
+        elif len(weekly) < MIN_WEEKLY_POINTS:
+            history["reconciliation"] = f"skipped: fewer than {MIN_WEEKLY_POINTS} weekly points"
+        else:
+            weekly_forecaster, weekly_params, weekly_mode, weekly_fits = _fit_forecaster(
+                weekly, series_id, weekly_order_history
+            )
+            searches.append((weekly_order_history, series_id, weekly_forecaster, weekly_mode, weekly_fits))
+
+            # Forecast daily to the end of the last forecast week, so every
+            # week's daily mean spans all seven days like the weekly model
+            last_week_end = weekly.index[-1]
+            observed = fit_series[fit_series.index > last_week_end].to_numpy()
+            last_day = fit_series.index[-1] + pd.Timedelta(days=horizon)
+            days = horizon + (6 - last_day.weekday()) % 7
+            dates = pd.date_range(start=fit_series.index[-1] + pd.Timedelta(days=1), periods=days, freq="D")
+            steps = weeks_ahead(dates, last_week_end)
+            daily_mean, _ = forecaster.forecast_distribution(days)
+            daily_cov = forecaster.forecast_covariance(days)
+            weekly_mean, weekly_se = weekly_forecaster.forecast_distribution(int(steps.max()))
+            mean, weights = reconcile_weekly(daily_mean, daily_cov, steps, weekly_mean, weekly_se, observed)
+            mean, weights, steps = mean[:horizon], weights[:horizon], steps[:horizon]
+
+            history["weekly_order"] = weekly_params["order"]
+            history["reconciliation"] = "applied"
+            # evaluate() refits the daily model only; compare=true backtests
+            # the reconciled forecast itself
+            history["accuracy_basis"] = "daily model before weekly reconciliation"
+            history["mean_weekly_weight"] = round(float(weights[steps >= 1].mean()), 4) if (steps >= 1).any() else 0.0
+
+    history["fit_time_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return {
+        "forecaster": forecaster,
+        "model_params": model_params,
+        "fit_series": fit_series,
+        "mean": mean,
+        "std_error": std_error,
+        "history": history,
+        "searches": searches,
+    }
+
+
+def _backtest_policy(series, horizon: int, policy: dict) -> dict:
+    """
+    Compare the policy against a full-history fit on the last ``horizon`` days.
+
+    Both are fitted on the history before the holdout, so the report shows
+    the accuracy given up (or gained) for the reduced fit cost.
+    """
+    train, test = series.iloc[:-horizon], series.iloc[-horizon:].to_numpy()
+    if len(train) < 30:
+        return {"skipped": "not enough history before the holdout window"}
+
+    report = {"holdout_days": horizon}
+    for label, candidate_policy in (("policy", policy), ("full_history", {**policy, "mode": "full"})):
+        if label == "full_history" and policy["mode"] == "full":
+            report[label] = report["policy"]
+            continue
+        outcome = _policy_forecast(train, horizon, candidate_policy)
+        errors = outcome["mean"] - test
+        report[label] = {
+            "mae": round(float(np.mean(np.abs(errors))), 2),
+            "rmse": round(float(np.sqrt(np.mean(errors ** 2))), 2),
+            "fit_time_ms": outcome["history"]["fit_time_ms"],
+            "points_used": outcome["history"]["points_used"],
+        }
+    return report
+
+
+def generate_forecast(emissions: list, horizon: int = 7, series_id: str = None,
+                      levels: list = None, history_policy: dict = None) -> dict:
     """
     Full forecasting pipeline: preprocess → fit → predict → evaluate.
 
     Args:
         emissions: List of emission record dicts from MongoDB.
         horizon: Number of days to forecast (7, 14, or 30).
+        series_id: Optional identity of the series (e.g. mine id). When
+            given, previously selected orders are tried first and only their
+            neighbourhood is searched, except for periodic full searches,
+            and the optimizer starts from the previous estimates.
+        levels: Optional confidence levels in percent (e.g. [50, 80, 95]).
+            When given, the response includes an 'intervals' band per level.
+        history_policy: Optional {mode, max_lookback_days, recent_days,
+            compare}; see ``resolve_history_policy``. With compare=True the
+            policy is backtested against a full-history fit.
 
     Returns:
         dict with:
             - forecast_data: list of {date, predicted, upper_bound, lower_bound}
             - model_accuracy: {mae, rmse}
-            - model_params: {order, aic}
+            - model_params: {order, aic, search, optimizer}
             - data_points_used: int
+            - history: {mode, points_available, points_used, fit_time_ms, ...}
+            - intervals: {level: {lower, upper}} (only when levels are given)
+            - diagnostics: {skipped_candidates, failed_candidates, used_fallback}
 
     Raises:
         ValueError: If data validation fails.
@@ -30,8 +245,9 @@ def generate_forecast(emissions: list, horizon: int = 7) -> dict:
     # Validate horizon
     if horizon not in (7, 14, 30):
         raise ValueError("Horizon must be 7, 14, or 30 days.")
+    policy = resolve_history_policy(history_policy)
 
-    logger.info(f"Starting forecast: {len(emissions)} records, horizon={horizon} days")
+    logger.info(f"Starting forecast: {len(emissions)} records, horizon={horizon} days, history={policy['mode']}")
 
     # Step 1: Process raw emission data
     series = process_emission_data(emissions)
@@ -44,32 +260,178 @@ def generate_forecast(emissions: list, horizon: int = 7) -> dict:
             f"got {len(series)}. Recommended: 60+ days of data."
         )
 
-    # Step 3: Fit ARIMA model
-    forecaster = ARIMAForecaster()
-    model_params = forecaster.fit(series)
-    logger.info(f"Model fitted: order={model_params['order']}, AIC={model_params['aic']}")
+    # Step 3: Fit the model(s) the history policy calls for
+    outcome = _policy_forecast(series, horizon, policy, series_id)
+    forecaster = outcome["forecaster"]
+    model_params = outcome["model_params"]
+    history = outcome["history"]
+    logger.info(
+        f"Model fitted: order={model_params['order']}, AIC={model_params['aic']}, "
+        f"search={model_params['search']['mode']} ({model_params['search']['candidates_fitted']} fits), "
+        f"history={history['points_used']}/{history['points_available']} points"
+    )
 
     # Step 4: Generate predictions
-    predictions = forecaster.predict(horizon)
+    first_date = outcome["fit_series"].index[-1] + pd.Timedelta(days=1)
+    predictions = build_prediction(outcome["mean"], outcome["std_error"], first_date, levels)
     logger.info(f"Forecast generated: {len(predictions['dates'])} days ahead")
 
     # Step 5: Evaluate model accuracy
     accuracy = forecaster.evaluate(test_ratio=0.2)
     logger.info(f"Model accuracy: MAE={accuracy['mae']}, RMSE={accuracy['rmse']}")
 
+    model_params["optimizer"] = forecaster.get_fit_stats()
+    logger.info(
+        f"Optimizer: {model_params['optimizer']['iterations']} iterations over "
+        f"{model_params['optimizer']['fits']} fits "
+        f"({model_params['optimizer']['warm_started_fits']} warm-started), "
+        f"{model_params['optimizer']['fit_time_ms']} ms"
+    )
+    for history_store, searched_id, searched, search_mode, fits_performed in outcome["searches"]:
+        _record_search(history_store, searched_id, searched, search_mode, fits_performed)
+
+    if policy["compare"]:
+        history["backtest"] = _backtest_policy(series, horizon, policy)
+        logger.info(f"History policy backtest: {history['backtest']}")
+
     # Step 6: Format output
-    forecast_data = []
-    for i in range(len(predictions["dates"])):
-        forecast_data.append({
-            "date": predictions["dates"][i],
-            "predicted": predictions["forecast"][i],
-            "upper_bound": predictions["confidence_upper"][i],
-            "lower_bound": predictions["confidence_lower"][i],
-        })
+    forecast_data = [
+        {"date": date, "predicted": predicted, "upper_bound": upper, "lower_bound": lower}
+        for date, predicted, upper, lower in zip(
+            predictions["dates"], predictions["forecast"],
+            predictions["confidence_upper"], predictions["confidence_lower"],
+        )
+    ]
 
-    return {
+    result = {
         "forecast_data": forecast_data,
         "model_accuracy": accuracy,
         "model_params": model_params,
-        "data_points_used": len(series),
+        "data_points_used": len(outcome["fit_series"]),
+        "history": history,
+        "diagnostics": forecaster.get_diagnostics(),
     }
+    if levels:
+        result["intervals"] = {
+            key: band for key, band in predictions["intervals"].items()
+            if float(key) in [float(level) for level in levels]
+        }
+    return result
+
+
+def generate_batch_forecast(mines: dict, horizon: int = 7, method: str = "ar") -> dict:
+    """
+    Forecast many mines in one vectorized pass.
+
+    Each mine's records are processed like a single forecast. Series are
+    aligned on the latest end date in the batch so every forecast covers the
+    same days; a mine whose history stops earlier, or is shorter than 30
+    points, is reported under ``errors`` instead of shortening everyone
+    else's window. The remaining mines keep their full histories: mines of
+    equal length are stacked into one matrix and fitted together by
+    BatchForecaster.
+
+    Args:
+        mines: Mapping of mine id to its list of emission record dicts.
+        horizon: Number of days to forecast (7, 14, or 30).
+        method: 'ar' (batched AR with drift) or 'ets' (Holt smoothing).
+
+    Returns:
+        dict with:
+            - forecasts: {mine_id: {forecast_data, model_params, trend_slope,
+              anomalies, data_points_used}}
+            - errors: {mine_id: reason} for mines left out of the batch
+            - method: str
+
+    Raises:
+        ValueError: If data validation fails or no mine can be forecast.
+    """
+    if horizon not in (7, 14, 30):
+        raise ValueError("Horizon must be 7, 14, or 30 days.")
+
+    logger.info(f"Starting batch forecast: {len(mines)} mines, horizon={horizon} days, method={method}")
+
+    errors = {}
+    series_by_mine = {}
+    for mine_id, records in mines.items():
+        try:
+            series_by_mine[mine_id] = process_emission_data(records)
+        except ValueError as e:
+            errors[mine_id] = str(e)
+
+    if not series_by_mine:
+        raise ValueError("No mine has usable emission data for batch forecasting.")
+
+    end = max(s.index.max() for s in series_by_mine.values())
+    groups = {}
+    for mine_id, series in series_by_mine.items():
+        if series.index.max() < end:
+            errors[mine_id] = (
+                f"History ends on {series.index.max():%Y-%m-%d}, before the batch end date {end:%Y-%m-%d}."
+            )
+        elif len(series) < 30:
+            errors[mine_id] = f"Insufficient data for batch forecasting. Need at least 30 data points, got {len(series)}."
+        else:
+            groups.setdefault(len(series), []).append(mine_id)
+
+    if not groups:
+        raise ValueError(f"No mine has enough history ending on {end:%Y-%m-%d} for batch forecasting.")
+
+    dates = pd.date_range(start=end + pd.Timedelta(days=1), periods=horizon, freq="D").strftime("%Y-%m-%d")
+
+    forecasts = {}
+    for n_days, mine_ids in groups.items():
+        matrix = np.vstack([series_by_mine[m].to_numpy() for m in mine_ids])
+        history_dates = series_by_mine[mine_ids[0]].index.strftime("%Y-%m-%d")
+
+        forecaster = BatchForecaster(method=method)
+        params = forecaster.fit(matrix)
+        predictions = forecaster.predict(horizon)
+        stats = batch_insights(matrix)
+
+        predicted = np.round(predictions["forecast"], 2)
+        lower = np.round(predictions["confidence_lower"], 2)
+        upper = np.round(predictions["confidence_upper"], 2)
+
+        for i, mine_id in enumerate(mine_ids):
+            model_params = {"aic": params["aic"][i]}
+            if "lags" in params:
+                model_params["lags"] = params["lags"][i]
+            forecasts[mine_id] = {
+                "forecast_data": [
+                    {"date": d, "predicted": p, "upper_bound": u, "lower_bound": lo}
+                    for d, p, u, lo in zip(dates, predicted[i].tolist(), upper[i].tolist(), lower[i].tolist())
+                ],
+                "model_params": model_params,
+                "trend_slope": round(float(stats["trend_slope"][i]), 4),
+                "anomalies": _batch_anomalies(history_dates, matrix[i], stats, i),
+                "data_points_used": n_days,
+            }
+
+    logger.info(
+        f"Batch forecast generated: {len(forecasts)} mines x {horizon} days in {len(groups)} group(s), "
+        f"{len(errors)} skipped"
+    )
+
+    return {
+        "forecasts": forecasts,
+        "errors": errors,
+        "method": method,
+    }
+
+
+def _batch_anomalies(dates, values: np.ndarray, stats: dict, row: int) -> list:
+    """Format one series' anomaly mask from batch_insights like the insights endpoint does."""
+    mean = stats["rolling_mean"][row]
+    std = stats["rolling_std"][row]
+    anomalies = []
+    for j in np.flatnonzero(stats["anomalies"][row]):
+        deviation = float(values[j] - mean[j])
+        anomalies.append({
+            "date": dates[j],
+            "value": round(float(values[j]), 2),
+            "expected": round(float(mean[j]), 2),
+            "deviation": round(deviation, 2),
+            "severity": "high" if abs(deviation) > 3 * std[j] else "medium",
+        })
+    return anomalies
@@ -0,0 +1,469 @@
+"""
+Insights service: anomaly detection, weekday seasonality, driver importance,
+recent trend and MAPE for an emission history.
+
+`compute_insights` recomputes everything from the full history.
+`IncrementalInsights` keeps each mine's history as column arrays so that a
+history which only gained new days at the end (and possibly lost old days
+at the start, as with the backend's sliding window) only has the anomalies
+of the changed rows recomputed. Both paths share the helpers below, so the
+incremental response is identical to a full recompute.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_processor import emission_frame
+from app.utils.logger import get_logger
+from app.utils.ndjson_stream import EmissionColumns
+
+logger = get_logger(__name__)
+
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+DRIVER_COLS = {
+    "fuel_emission": "Fuel Combustion",
+    "electricity_emission": "Electricity",
+    "explosives_emission": "Explosives",
+    "transport_emission": "Transport",
+    "methane_emissions_co2e": "Methane",
+}
+
+ROLLING_WINDOW = 7
+ROLLING_MIN_PERIODS = 3
+RECENT_DAYS = 30
+
+
+def compute_insights(emissions: list, forecast_data: list) -> dict:
+    """
+    Compute insights from the full emission history.
+
+    Args:
+        emissions: List of emission record dicts (at least 7), or
+            EmissionColumns parsed from an NDJSON upload.
+        forecast_data: Cached forecast entries; enables the MAPE estimate.
+
+    Returns:
+        dict with 'anomalies', 'seasonality', 'drivers', 'trend', 'mape'.
+    """
+    df = _prepare_frame(emissions)
+    dates = df["date"].to_numpy()
+    series = df["total_carbon_emission"].astype(float).to_numpy()
+
+    # --- Anomaly Detection (residual-based, 2-sigma) ---
+    anomalies = [anomaly for _, anomaly in _window_anomalies(dates, series)]
+
+    # --- Driver Importance (proportion-based) ---
+    driver_totals = _driver_totals({
+        col: df[col].astype(float).to_numpy() for col in DRIVER_COLS if col in df.columns
+    })
+
+    # --- Seasonality, trend and MAPE (last 30 days) ---
+    recent = _recent_insights(dates[-RECENT_DAYS:], series[-RECENT_DAYS:], forecast_data)
+
+    return {
+        "anomalies": anomalies,
+        "seasonality": recent["seasonality"],
+        "drivers": _build_drivers(driver_totals),
+        "trend": recent["trend"],
+        "mape": recent["mape"],
+    }
+
+
+def _prepare_frame(emissions) -> pd.DataFrame:
+    """Emission records as a DataFrame with parsed dates, sorted, undated rows dropped."""
+    df = emission_frame(emissions)
+    # Parse dates — handle both tz-aware and tz-naive strings
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", utc=True)
+    df["date"] = df["date"].dt.tz_convert(None)
+    return df.sort_values("date").dropna(subset=["date"])
+
+
+def _rolling_stats(values: np.ndarray) -> tuple:
+    """
+    Mean and sample std of each point's trailing ROLLING_WINDOW values.
+
+    Every window is reduced on its own (NaN-padded at the start), so a
+    point's statistics depend only on its window and not on where the
+    array starts; NaN where fewer than ROLLING_MIN_PERIODS values are valid.
+    """
+    if len(values) == 0:
+        return np.array([]), np.array([])
+    padded = np.concatenate([np.full(ROLLING_WINDOW - 1, np.nan), np.asarray(values, dtype=float)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, ROLLING_WINDOW)
+    valid = ~np.isnan(windows)
+    count = valid.sum(axis=1)
+    mean = np.where(valid, windows, 0.0).sum(axis=1) / np.maximum(count, 1)
+    deviations = np.where(valid, windows - mean[:, None], 0.0)
+    std = np.sqrt((deviations * deviations).sum(axis=1) / np.maximum(count - 1, 1))
+    too_few = count < ROLLING_MIN_PERIODS
+    mean[too_few] = np.nan
+    std[too_few] = np.nan
+    return mean, std
+
+
+def _window_anomalies(dates: np.ndarray, values: np.ndarray, start: int = 0) -> list:
+    """(position, anomaly) for the points from ``start`` on, judged against their trailing window."""
+    mean, std = _rolling_stats(values)
+    found = []
+    for i in range(start, len(values)):
+        anomaly = _check_anomaly(pd.Timestamp(dates[i]), float(values[i]), float(mean[i]), float(std[i]))
+        if anomaly:
+            found.append((i, anomaly))
+    return found
+
+
+def _driver_totals(columns: dict) -> dict:
+    """Sum each present driver column (NaN skipped), keyed by driver label."""
+    return {DRIVER_COLS[col]: float(np.nansum(values)) for col, values in columns.items()}
+
+
+def _recent_insights(dates: np.ndarray, values: np.ndarray, forecast_data: list) -> dict:
+    """Weekday seasonality, trend slope and MAPE of the most recent rows."""
+    recent = pd.DataFrame({"date": dates, "total_carbon_emission": values})
+    recent["weekday"] = recent["date"].dt.day_name()
+    weekday_avg = recent.groupby("weekday")["total_carbon_emission"].mean()
+    weekday_avg = weekday_avg.reindex(WEEKDAY_ORDER).fillna(0)
+
+    # Linear regression on the recent rows
+    slope = None
+    if len(values) >= 7:
+        x = np.arange(len(values))
+        slope = float(np.polyfit(x, values, 1)[0])
+
+    return {
+        "seasonality": _build_seasonality([float(weekday_avg[day]) for day in WEEKDAY_ORDER]),
+        "trend": _build_trend(slope),
+        "mape": _estimate_mape(values, forecast_data),
+    }
+
+
+def _check_anomaly(date, value: float, mean: float, std: float):
+    """Return the anomaly entry for one point, or None if it is normal."""
+    if np.isnan(value) or np.isnan(mean) or np.isnan(std):
+        return None
+    threshold = std * 2
+    deviation = value - mean
+    if abs(deviation) > threshold and threshold > 0:
+        return {
+            "date": date.strftime("%Y-%m-%d"),
+            "value": round(value, 2),
+            "expected": round(mean, 2),
+            "deviation": round(deviation, 2),
+            "severity": "high" if abs(deviation) > std * 3 else "medium",
+        }
+    return None
+
+
+def _build_seasonality(weekday_means: list) -> dict:
+    """Format weekday averages (Monday first) and the textual insight."""
+    weekday_data = [
+        {"day": day, "avg_emission": round(float(val), 2)}
+        for day, val in zip(WEEKDAY_ORDER, weekday_means)
+    ]
+
+    weekday_mean = float(np.mean(weekday_means[:5]))
+    weekend_mean = float(np.mean(weekday_means[5:]))
+    seasonal_insight = ""
+    if weekday_mean > 0:
+        pct_diff = ((weekend_mean - weekday_mean) / weekday_mean) * 100
+        if pct_diff > 5:
+            seasonal_insight = f"Weekend emissions are {abs(pct_diff):.0f}% higher than weekdays."
+        elif pct_diff < -5:
+            seasonal_insight = f"Weekday emissions are {abs(pct_diff):.0f}% higher than weekends."
+        else:
+            seasonal_insight = "Emissions are relatively consistent across all days."
+
+    return {
+        "weekday_data": weekday_data,
+        "insight": seasonal_insight,
+        "has_pattern": abs(weekend_mean - weekday_mean) / max(weekday_mean, 1.0) > 0.05,
+    }
+
+
+def _build_drivers(driver_totals: dict) -> list:
+    """Convert per-driver emission totals into weighted driver entries."""
+    total_all = sum(driver_totals.values())
+    drivers = []
+    for label, val in driver_totals.items():
+        pct = (val / total_all * 100) if total_all > 0 else 0
+        direction = "increase"  # simplified; could do trend analysis per driver
+        drivers.append({
+            "name": label,
+            "weight": round(pct, 1),
+            "direction": direction,
+        })
+    drivers.sort(key=lambda x: x["weight"], reverse=True)
+    return drivers
+
+
+def _build_trend(slope) -> dict:
+    """Describe the recent trend from its regression slope (None if too short)."""
+    if slope is None:
+        return {"direction": "stable", "slope": 0, "description": "Insufficient data for trend analysis."}
+    if slope > 0.5:
+        trend_direction = "rising"
+    elif slope < -0.5:
+        trend_direction = "falling"
+    else:
+        trend_direction = "stable"
+    return {
+        "direction": trend_direction,
+        "slope": round(slope, 4),
+        "description": f"{'Upward' if trend_direction == 'rising' else 'Downward' if trend_direction == 'falling' else 'Stable'} trend detected in recent emissions.",
+    }
+
+
+def _estimate_mape(recent_series: np.ndarray, forecast_data: list):
+    """MAPE of a 7-day rolling-mean predictor over the last few actuals."""
+    mape = None
+    if forecast_data and len(forecast_data) > 0:
+        # Use last few actuals as pseudo-test set for MAPE estimation
+        test_n = min(len(recent_series), 10)
+        if test_n > 0:
+            actuals = recent_series[-test_n:]
+            mean_actual = float(np.mean(actuals))
+            if mean_actual > 0:
+                # Estimate MAPE from rolling prediction errors
+                pred_series = recent_series[-(test_n + 7):]
+                if len(pred_series) > test_n:
+                    rolling_pred = pd.Series(pred_series).rolling(7).mean().dropna().values[-test_n:]
+                    if len(rolling_pred) == test_n:
+                        ape = np.abs((actuals - rolling_pred) / np.maximum(actuals, 1)) * 100
+                        mape = round(float(np.mean(ape)), 2)
+    return mape
+
+
+def _parse_dates(raw_dates) -> np.ndarray:
+    """Parse record dates the same way compute_insights does (UTC, naive)."""
+    if len(raw_dates) == 0:
+        return np.array([], dtype="datetime64[ns]")
+    parsed = pd.to_datetime(list(raw_dates), errors="coerce", utc=True)
+    return parsed.tz_convert(None).to_numpy()
+
+
+def _float_array(values: list) -> np.ndarray:
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_to_float(value) for value in values], dtype=float)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _record_columns(emissions) -> dict:
+    """
+    Raw dates, totals, driver values and per-row driver presence of the
+    records, in request order, as arrays.
+
+    EmissionColumns from an NDJSON upload already hold these arrays and are
+    used directly, without going through per-record dicts.
+    """
+    n = len(emissions)
+    if isinstance(emissions, EmissionColumns):
+        return {
+            "raw_dates": emissions.dates[:n],
+            "totals": emissions.totals[:n],
+            "drivers": {col: emissions.drivers[col][:n] for col in DRIVER_COLS},
+            "has": {col: np.full(n, col in emissions.present) for col in DRIVER_COLS},
+        }
+    return {
+        "raw_dates": np.array([record.get("date") for record in emissions], dtype=object),
+        "totals": _float_array([record.get("total_carbon_emission") for record in emissions]),
+        "drivers": {col: _float_array([record.get(col) for record in emissions]) for col in DRIVER_COLS},
+        "has": {col: np.fromiter((col in record for record in emissions), dtype=bool, count=n) for col in DRIVER_COLS},
+    }
+
+
+class InsightsState:
+    """
+    One mine's emission history as date-sorted column arrays.
+
+    Keeps the raw date, parsed date, total, driver values and per-row driver
+    presence of every row (so requests can be compared against it and rows
+    evicted from the front), plus the anomalies found so far keyed by row
+    number since the state was built.
+    """
+
+    def __init__(self, raw_dates, dates, totals, drivers: dict, has: dict):
+        self.raw_dates = raw_dates
+        self.dates = dates
+        self.totals = totals
+        self.drivers = drivers
+        self.has = has
+        self.dropped = 0  # rows evicted so far; anomaly keys are dropped + position
+        self.anomalies = deque(_window_anomalies(dates, totals))
+
+    def __len__(self):
+        return len(self.totals)
+
+    def evict(self, count: int):
+        """Drop the ``count`` oldest rows (the backend's window moved forward)."""
+        self._set_columns(lambda values: values[count:])
+        self.dropped += count
+
+        # The new first rows now see a shorter rolling window, so drop the
+        # anomalies up to the last affected row and re-check those rows
+        affected = min(ROLLING_WINDOW - 1, len(self))
+        while self.anomalies and self.anomalies[0][0] < self.dropped + affected:
+            self.anomalies.popleft()
+        refreshed = _window_anomalies(self.dates[:affected], self.totals[:affected])
+        self.anomalies.extendleft(reversed([(self.dropped + i, a) for i, a in refreshed]))
+
+    def append(self, raw_dates, dates, totals, drivers: dict, has: dict):
+        """Append rows newer than every existing row."""
+        previous = len(self)
+        self.raw_dates = np.concatenate([self.raw_dates, raw_dates])
+        self.dates = np.concatenate([self.dates, dates])
+        self.totals = np.concatenate([self.totals, totals])
+        self.drivers = {col: np.concatenate([self.drivers[col], drivers[col]]) for col in DRIVER_COLS}
+        self.has = {col: np.concatenate([self.has[col], has[col]]) for col in DRIVER_COLS}
+
+        # Only the trailing window of each new row is needed
+        lo = max(0, previous - (ROLLING_WINDOW - 1))
+        found = _window_anomalies(self.dates[lo:], self.totals[lo:], start=previous - lo)
+        self.anomalies.extend((self.dropped + lo + i, a) for i, a in found)
+
+    def _set_columns(self, transform):
+        self.raw_dates = transform(self.raw_dates)
+        self.dates = transform(self.dates)
+        self.totals = transform(self.totals)
+        self.drivers = {col: transform(values) for col, values in self.drivers.items()}
+        self.has = {col: transform(values) for col, values in self.has.items()}
+
+    def matches(self, start: int, columns: dict, count: int) -> bool:
+        """Whether rows ``start:`` equal the first ``count`` request rows."""
+        if not np.array_equal(self.raw_dates[start:], columns["raw_dates"][:count]):
+            return False
+        if not np.array_equal(self.totals[start:], columns["totals"][:count], equal_nan=True):
+            return False
+        for col in DRIVER_COLS:
+            if not np.array_equal(self.has[col][start:], columns["has"][col][:count]):
+                return False
+            if not np.array_equal(self.drivers[col][start:], columns["drivers"][col][:count], equal_nan=True):
+                return False
+        return True
+
+    def to_insights(self, forecast_data: list) -> dict:
+        """Build the insights response from the current rows."""
+        driver_totals = _driver_totals({
+            col: self.drivers[col] for col in DRIVER_COLS if self.has[col].any()
+        })
+        recent = _recent_insights(self.dates[-RECENT_DAYS:], self.totals[-RECENT_DAYS:], forecast_data)
+        return {
+            "anomalies": [anomaly for _, anomaly in self.anomalies],
+            "seasonality": recent["seasonality"],
+            "drivers": _build_drivers(driver_totals),
+            "trend": recent["trend"],
+            "mape": recent["mape"],
+        }
+
+
+class _MineSlot:
+    """Cached state of one mine, guarded by its own lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+
+
+class IncrementalInsights:
+    """
+    Per-mine cache of InsightsState objects with LRU eviction.
+
+    A request is applied incrementally when its history is the cached one
+    with rows dropped from the start and/or new days added at the end;
+    anything else (edited values or dates, unsorted history) triggers a
+    rebuild. The overlap with the cached rows is compared in full, because
+    the backend edits existing days in place and any day can be edited:
+    that check is O(history) but vectorised, while anomalies are only
+    recomputed for the rows that changed. Each mine has its own lock, so
+    requests for different mines run concurrently; the shared lock only
+    guards the LRU dict.
+    """
+
+    def __init__(self, max_mines: int = 256):
+        self.max_mines = max_mines
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_insights(self, mine_id: str, emissions: list, forecast_data: list) -> dict:
+        slot = self._slot(mine_id)
+        with slot.lock:
+            if slot.state is None or not self._apply(slot.state, emissions):
+                slot.state = self._build(emissions)
+            return slot.state.to_insights(forecast_data)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def _slot(self, mine_id: str) -> _MineSlot:
+        """Get or create the mine's slot and mark it most recently used."""
+        with self._lock:
+            slot = self._states.pop(mine_id, None) or _MineSlot()
+            self._states[mine_id] = slot
+            while len(self._states) > self.max_mines:
+                self._states.popitem(last=False)
+            return slot
+
+    def _build(self, emissions: list) -> InsightsState:
+        # Same parsing, sorting and dropping as compute_insights
+        df = _prepare_frame(emissions)
+        order = df.index.to_numpy()
+        columns = _record_columns(emissions)
+        return InsightsState(
+            raw_dates=columns["raw_dates"][order],
+            dates=df["date"].to_numpy(),
+            totals=df["total_carbon_emission"].astype(float).to_numpy(),
+            drivers={col: columns["drivers"][col][order] for col in DRIVER_COLS},
+            has={col: columns["has"][col][order] for col in DRIVER_COLS},
+        )
+
+    def _apply(self, state: InsightsState, emissions: list) -> bool:
+        """Bring ``state`` up to date with ``emissions``; False if a rebuild is needed."""
+        if len(state) == 0 or len(emissions) == 0:
+            return False
+
+        columns = _record_columns(emissions)
+        # The window starts at a cached day (found by its raw date string)
+        # unless the history was rewritten
+        start = np.flatnonzero(state.raw_dates == columns["raw_dates"][0])
+        if len(start) == 0:
+            return False
+        evict = int(start[0])
+        kept = len(state) - evict
+        if kept > len(emissions):
+            return False
+
+        # Every overlapping record must be unchanged; the backend updates
+        # existing days' records in place as emissions are logged
+        if not state.matches(evict, columns, kept):
+            return False
+
+        new_dates = _parse_dates(columns["raw_dates"][kept:])
+        if len(new_dates):
+            if np.isnat(new_dates).any() or new_dates[0] <= state.dates[-1]:
+                return False
+            if (np.diff(new_dates) <= np.timedelta64(0)).any():
+                return False
+
+        if evict:
+            state.evict(evict)
+        if len(new_dates):
+            state.append(
+                columns["raw_dates"][kept:], new_dates, columns["totals"][kept:],
+                {col: values[kept:] for col, values in columns["drivers"].items()},
+                {col: values[kept:] for col, values in columns["has"].items()},
+            )
+
+        logger.info(f"Incremental insights: evicted {evict}, appended {len(new_dates)} rows")
+        return True
@@ -0,0 +1,132 @@
+"""
+Per-series ARIMA order history.
+
+Remembers which orders won for each series identity (typically a mine id)
+so the next refresh can try them first and only search a small
+neighbourhood of the previous winner, with a full-grid search every
+``full_search_interval`` refreshes to catch regime changes. The latest
+parameter estimates per order are kept too, as optimizer starting values.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+
+class OrderHistory:
+    """Thread-safe registry of recently selected orders per series."""
+
+    def __init__(self, full_search_interval: int = 7, history_size: int = 10, max_series: int = 1024):
+        self.full_search_interval = max(1, full_search_interval)
+        self.history_size = history_size
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._totals = {
+            "searches": 0,
+            "full_searches": 0,
+            "warm_searches": 0,
+            "fits_performed": 0,
+            "fits_avoided": 0,
+            "order_repeats": 0,
+            "order_changes": 0,
+        }
+
+    def candidates_for(self, series_id: str, grid: list) -> tuple:
+        """
+        Return (candidate orders, search mode) for the next fit of a series.
+
+        Mode is 'full' when there is no history or a periodic full search is
+        due, otherwise 'warm': the previous winners (most recent first)
+        followed by the +/-1 (p, q) neighbours of the last winner.
+        """
+        grid = [tuple(o) for o in grid]
+        with self._lock:
+            entry = self._series.get(series_id)
+            if entry is None or not entry["orders"] or entry["since_full"] + 1 >= self.full_search_interval:
+                return grid, "full"
+
+            candidates = []
+            for order in reversed(entry["orders"]):
+                if order not in candidates:
+                    candidates.append(order)
+            for order in _neighbours(entry["orders"][-1]):
+                if order not in candidates:
+                    candidates.append(order)
+            return candidates, "warm"
+
+    def start_params_for(self, series_id: str) -> dict:
+        """Latest parameter estimates per order for a series (may be empty)."""
+        with self._lock:
+            entry = self._series.get(series_id)
+            return dict(entry["params"]) if entry else {}
+
+    def record(self, series_id: str, order: tuple, mode: str, fits_performed: int, grid_size: int,
+               params: dict = None):
+        """Store the winning order of a search (and fitted parameters) and update the statistics."""
+        order = tuple(order)
+        with self._lock:
+            entry = self._series.pop(series_id, None)
+            if entry is None:
+                entry = {
+                    "orders": deque(maxlen=self.history_size),
+                    "since_full": 0,
+                    "searches": 0,
+                    "repeats": 0,
+                    "params": {},
+                }
+            self._series[series_id] = entry
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+
+            if entry["orders"]:
+                if entry["orders"][-1] == order:
+                    entry["repeats"] += 1
+                    self._totals["order_repeats"] += 1
+                else:
+                    self._totals["order_changes"] += 1
+            entry["orders"].append(order)
+            if params:
+                entry["params"].update(params)
+            entry["searches"] += 1
+            entry["since_full"] = 0 if mode == "full" else entry["since_full"] + 1
+
+            self._totals["searches"] += 1
+            self._totals[f"{mode}_searches"] += 1
+            self._totals["fits_performed"] += fits_performed
+            self._totals["fits_avoided"] += max(0, grid_size - fits_performed)
+
+    def stats(self) -> dict:
+        """Aggregate and per-series order-stability statistics."""
+        with self._lock:
+            compared = self._totals["order_repeats"] + self._totals["order_changes"]
+            return {
+                **self._totals,
+                "order_stability": round(self._totals["order_repeats"] / compared, 4) if compared else None,
+                "series_tracked": len(self._series),
+                "series": {
+                    series_id: {
+                        "last_order": list(entry["orders"][-1]),
+                        "searches": entry["searches"],
+                        "repeats": entry["repeats"],
+                        "recent_orders": [list(o) for o in entry["orders"]],
+                    }
+                    for series_id, entry in self._series.items()
+                },
+            }
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            for key in self._totals:
+                self._totals[key] = 0
+
+
+def _neighbours(order: tuple) -> list:
+    """Orders one step away in p or q, keeping d and excluding (0, d, 0)."""
+    p, d, q = order
+    result = []
+    for dp, dq in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        np_, nq = p + dp, q + dq
+        if 0 <= np_ <= 3 and 0 <= nq <= 3 and (np_, nq) != (0, 0):
+            result.append((np_, d, nq))
+    return result
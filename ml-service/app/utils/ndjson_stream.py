@@ -0,0 +1,180 @@
+"""
+Streaming NDJSON ingestion of emission records.
+
+Large uploads can be sent as newline-delimited JSON (Content-Type
+``application/x-ndjson``) instead of one JSON document. An optional first
+line ``{"params": {...}}`` carries the request options (horizon, mine_id,
+levels, ...); every other line is one emission record.
+
+Lines are parsed one at a time straight into preallocated NumPy column
+buffers, and each record is validated as it arrives, so a bad payload is
+rejected at the offending line and the full list of Python dicts is never
+materialized.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.utils.validators import validate_emission_record
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+DRIVER_COLUMNS = (
+    "fuel_emission",
+    "electricity_emission",
+    "explosives_emission",
+    "transport_emission",
+    "methane_emissions_co2e",
+)
+
+# Rough size of one serialized record, used to size buffers from Content-Length
+_BYTES_PER_RECORD = 150
+_MIN_CAPACITY = 256
+# Content-Length is client-supplied; never preallocate more than this many
+# rows up front and let the buffers double as records actually arrive
+_MAX_INITIAL_CAPACITY = 4096
+
+
+def is_ndjson(content_type: str) -> bool:
+    """Whether a request Content-Type denotes an NDJSON upload."""
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+class EmissionColumns:
+    """
+    Column-oriented emission records backed by growable NumPy buffers.
+
+    Behaves like a read-only sequence of record dicts (len, indexing,
+    slicing) so it can stand in for the JSON list of records, and converts
+    to a DataFrame without going through per-record dicts.
+    """
+
+    def __init__(self, capacity: int = _MIN_CAPACITY):
+        capacity = max(int(capacity), 1)
+        self.count = 0
+        self.dates = np.empty(capacity, dtype=object)
+        self.totals = np.empty(capacity, dtype=float)
+        self.drivers = {col: np.full(capacity, np.nan) for col in DRIVER_COLUMNS}
+        self.present = set()
+
+    def append(self, record: dict):
+        if self.count == len(self.dates):
+            self._grow()
+        i = self.count
+        self.dates[i] = record["date"]
+        self.totals[i] = float(record["total_carbon_emission"])
+        for col in DRIVER_COLUMNS:
+            if col in record:
+                self.present.add(col)
+                value = record[col]
+                self.drivers[col][i] = np.nan if value is None else float(value)
+        self.count += 1
+
+    def _grow(self):
+        capacity = len(self.dates) * 2
+        self.dates = np.resize(self.dates, capacity)
+        self.totals = np.resize(self.totals, capacity)
+        for col, values in self.drivers.items():
+            grown = np.full(capacity, np.nan)
+            grown[:len(values)] = values
+            self.drivers[col] = grown
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame with 'date', 'total_carbon_emission' and any driver columns seen."""
+        n = self.count
+        columns = {"date": self.dates[:n], "total_carbon_emission": self.totals[:n]}
+        for col in DRIVER_COLUMNS:
+            if col in self.present:
+                columns[col] = self.drivers[col][:n]
+        return pd.DataFrame(columns)
+
+    def _record(self, i: int) -> dict:
+        record = {"date": self.dates[i], "total_carbon_emission": float(self.totals[i])}
+        for col in DRIVER_COLUMNS:
+            if col in self.present:
+                record[col] = float(self.drivers[col][i])
+        return record
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("record index out of range")
+        return self._record(index)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._record(i)
+
+
+def read_emission_stream(stream, content_length: int = None, validate_params=None) -> dict:
+    """
+    Parse an NDJSON upload into request parameters and EmissionColumns.
+
+    Args:
+        stream: Binary file-like object (e.g. Flask ``request.stream``).
+        content_length: Request size, used to preallocate the buffers (up
+            to ``_MAX_INITIAL_CAPACITY`` rows).
+        validate_params: Optional callable returning (is_valid, error) for the
+            parameters; called before any record is read.
+
+    Returns:
+        dict of the request parameters with 'emissions' set to the records.
+
+    Raises:
+        ValueError: On the first malformed line or invalid record/parameters.
+    """
+    capacity = min(max(_MIN_CAPACITY, (content_length or 0) // _BYTES_PER_RECORD), _MAX_INITIAL_CAPACITY)
+    columns = EmissionColumns(capacity)
+    params = None
+
+    for line_number, raw_line in enumerate(stream, start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {line_number}: invalid JSON.") from None
+
+        if params is None:
+            params = {}
+            if isinstance(item, dict) and "params" in item:
+                if not isinstance(item["params"], dict):
+                    raise ValueError(f"Line {line_number}: 'params' must be an object.")
+                params = dict(item["params"])
+                _check_params(params, validate_params)
+                continue
+            _check_params(params, validate_params)
+
+        is_valid, error_msg = validate_emission_record(item)
+        if not is_valid:
+            raise ValueError(f"Line {line_number}: {error_msg}")
+        try:
+            columns.append(item)
+        except (TypeError, ValueError):
+            raise ValueError(f"Line {line_number}: emission driver values must be numeric.") from None
+
+    if params is None:
+        params = {}
+        _check_params(params, validate_params)
+    if len(columns) == 0:
+        raise ValueError("No emission records in upload.")
+
+    params["emissions"] = columns
+    return params
+
+
+def _check_params(params: dict, validate_params):
+    if validate_params is None:
+        return
+    is_valid, error_msg = validate_params(params)
+    if not is_valid:
+        raise ValueError(error_msg)
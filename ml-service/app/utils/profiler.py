@@ -0,0 +1,136 @@
+"""
+On-demand cProfile capture for slow requests.
+
+Profiling is opt-in: with PROFILING_ENABLED unset the `profiled` decorator
+returns the view function unchanged, so there is no per-request cost.
+When enabled, a request is profiled if it sends ``X-Profile: 1`` or is
+picked by PROFILE_SAMPLE_RATE; the last PROFILE_RING_SIZE profiles are kept
+in memory and served by the debug blueprint.
+
+The ring lives in the worker process that handled the request, so under a
+multi-worker server (gunicorn --workers N) a profile can only be fetched from
+the same worker. Each entry records its ``worker_pid`` and the response
+carries it in ``X-Profile-Worker``.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+
+class ProfileStore:
+    """Bounded in-memory ring of captured profiles."""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.0, size: int = 20):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+        # cProfile can't run in two threads at once; skip overlapping requests
+        self._active = threading.Lock()
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._profiles.append(entry)
+
+    def list(self) -> list:
+        """Summaries of stored profiles, newest first."""
+        with self._lock:
+            return [
+                {k: v for k, v in entry.items() if k != "stats"}
+                for entry in reversed(self._profiles)
+            ]
+
+    def get(self, profile_id: str):
+        with self._lock:
+            for entry in self._profiles:
+                if entry["id"] == profile_id:
+                    return entry
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profile_store = ProfileStore(
+    enabled=os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes"),
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", 0.0)),
+    size=int(os.getenv("PROFILE_RING_SIZE", 20)),
+)
+
+
+def profiled(name: str, store: ProfileStore = None):
+    """
+    Decorate a Flask view so selected requests are captured with cProfile.
+
+    Args:
+        name: Label stored with each profile (e.g. 'forecast').
+        store: ProfileStore to use; defaults to the module-level store.
+    """
+    store = store or profile_store
+
+    def decorator(func):
+        if not store.enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if request.headers.get(PROFILE_HEADER) == "1":
+                trigger = "header"
+            elif store.sample_rate > 0 and random.random() < store.sample_rate:
+                trigger = "sample"
+            else:
+                return func(*args, **kwargs)
+
+            if not store._active.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                result = profiler.runcall(func, *args, **kwargs)
+                duration_ms = (time.perf_counter() - start) * 1000
+            finally:
+                store._active.release()
+
+            response = make_response(result)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(40)
+
+            profile_id = uuid.uuid4().hex[:12]
+            store.add({
+                "id": profile_id,
+                "endpoint": name,
+                "trigger": trigger,
+                "status_code": response.status_code,
+                "duration_ms": round(duration_ms, 1),
+                "content_length": request.content_length,
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+                "worker_pid": os.getpid(),
+                "stats": stream.getvalue(),
+            })
+            logger.info(f"Captured profile {profile_id} for {name} ({duration_ms:.1f} ms, {trigger})")
+
+            response.headers["X-Profile-Id"] = profile_id
+            response.headers["X-Profile-Worker"] = str(os.getpid())
+            return response
+
+        return wrapper
+
+    return decorator
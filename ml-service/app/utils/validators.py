@@ -23,10 +23,9 @@ def validate_forecast_request(data: dict) -> tuple:
     if len(data["emissions"]) == 0:
         return False, "'emissions' list is empty."
 
-    # Validate horizon if provided
-    horizon = data.get("horizon", 7)
-    if horizon not in (7, 14, 30):
-        return False, "Horizon must be 7, 14, or 30 days."
+    is_valid, error_msg = validate_forecast_params(data)
+    if not is_valid:
+        return False, error_msg
 
     # Validate that emission records have required fields
     sample = data["emissions"][0]
@@ -36,3 +35,112 @@ def validate_forecast_request(data: dict) -> tuple:
         return False, "Emission records must contain 'total_carbon_emission' field."
 
     return True, None
+
+
+def validate_forecast_params(data: dict) -> tuple:
+    """
+    Validate the forecast options (everything except the emission records).
+
+    Args:
+        data: Request JSON body or streamed request parameters.
+
+    Returns:
+        (is_valid: bool, error_message: str or None)
+    """
+    # Validate horizon if provided
+    horizon = data.get("horizon", 7)
+    if horizon not in (7, 14, 30):
+        return False, "Horizon must be 7, 14, or 30 days."
+
+    # Validate confidence levels if provided
+    is_valid, error_msg = validate_levels(data.get("levels"))
+    if not is_valid:
+        return False, error_msg
+
+    # Validate history policy shape if provided (values are checked by the service)
+    history_policy = data.get("history_policy")
+    if history_policy is not None and not isinstance(history_policy, dict):
+        return False, "'history_policy' must be an object."
+
+    return True, None
+
+
+def validate_emission_record(record) -> tuple:
+    """
+    Validate a single emission record (used while streaming NDJSON uploads).
+
+    Returns:
+        (is_valid: bool, error_message: str or None)
+    """
+    if not isinstance(record, dict):
+        return False, "Emission records must be JSON objects."
+
+    if not isinstance(record.get("date"), str):
+        return False, "Emission records must contain a 'date' string."
+
+    total = record.get("total_carbon_emission")
+    if isinstance(total, bool) or not isinstance(total, (int, float)):
+        return False, "Emission records must contain a numeric 'total_carbon_emission'."
+
+    return True, None
+
+
+def validate_batch_forecast_request(data: dict) -> tuple:
+    """
+    Validate the incoming batch forecast request body.
+
+    Args:
+        data: Request JSON body.
+
+    Returns:
+        (is_valid: bool, error_message: str or None)
+    """
+    if not data:
+        return False, "Request body is empty."
+
+    if "mines" not in data:
+        return False, "Missing required field: 'mines'."
+
+    mines = data["mines"]
+    if not isinstance(mines, dict) or len(mines) == 0:
+        return False, "'mines' must be a non-empty mapping of mine id to emission records."
+
+    horizon = data.get("horizon", 7)
+    if horizon not in (7, 14, 30):
+        return False, "Horizon must be 7, 14, or 30 days."
+
+    method = data.get("method", "ar")
+    if method not in ("ar", "ets"):
+        return False, "Method must be 'ar' or 'ets'."
+
+    for mine_id, records in mines.items():
+        if not isinstance(records, list) or len(records) == 0:
+            return False, f"Emission records for mine '{mine_id}' must be a non-empty list."
+        sample = records[0]
+        if not isinstance(sample, dict) or "date" not in sample or "total_carbon_emission" not in sample:
+            return False, (
+                f"Emission records for mine '{mine_id}' must contain "
+                f"'date' and 'total_carbon_emission' fields."
+            )
+
+    return True, None
+
+
+def validate_levels(levels) -> tuple:
+    """
+    Validate optional prediction-interval confidence levels (in percent).
+
+    Returns:
+        (is_valid: bool, error_message: str or None)
+    """
+    if levels is None:
+        return True, None
+
+    if not isinstance(levels, list) or len(levels) == 0:
+        return False, "'levels' must be a non-empty list of confidence levels."
+
+    for level in levels:
+        if isinstance(level, bool) or not isinstance(level, (int, float)) or not 0 < level < 100:
+            return False, "Confidence levels must be numbers between 0 and 100 (exclusive)."
+
+    return True, None
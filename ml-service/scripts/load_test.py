@@ -0,0 +1,298 @@
+"""
+Load-testing harness for the ML service.
+
+Starts the app under gunicorn for each worker/thread configuration, replays
+a dashboard-like mix of forecast and insights requests and reports
+throughput, latency percentiles and error rates.
+
+Run from ml-service/:
+    python scripts/load_test.py --configs 1x1,2x1,2x4 --duration 30
+    python scripts/load_test.py --url http://localhost:5001   # existing server
+
+Results are printed as a table and written as JSON (see --output).
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+HISTORY_LENGTHS = [30, 60, 90, 120, 365, 730, 1825]
+HORIZONS = [7, 14, 30]
+
+
+def make_records(n_days: int, rng: random.Random, end: date) -> list:
+    """Synthetic daily emission records shaped like the backend payload."""
+    base = rng.uniform(20000, 40000)
+    slope = rng.uniform(-10, 10)
+    records = []
+    for i in range(n_days):
+        day = end - timedelta(days=n_days - 1 - i)
+        fuel = rng.uniform(3000, 7000) * 2.68
+        electricity = rng.uniform(8000, 15000) * 0.82
+        explosives = rng.uniform(100, 400) * 1.5
+        transport = rng.uniform(1000, 4000) * 2.68
+        methane = rng.uniform(60, 140) * 28
+        scale = max(base + slope * i, 1000) / 30000
+        records.append({
+            "date": day.strftime("%Y-%m-%dT00:00:00.000Z"),
+            "total_carbon_emission": round((fuel + electricity + explosives + transport + methane) * scale, 2),
+            "fuel_emission": round(fuel * scale, 2),
+            "electricity_emission": round(electricity * scale, 2),
+            "explosives_emission": round(explosives * scale, 2),
+            "transport_emission": round(transport * scale, 2),
+            "methane_emissions_co2e": round(methane * scale, 2),
+        })
+    return records
+
+
+def build_workload(n_requests: int, n_mines: int, insights_ratio: float, repeat_ratio: float,
+                   seed: int) -> list:
+    """
+    Pre-serialize a request mix as (endpoint, body bytes) tuples.
+
+    Each mine has a fixed history length; a share of requests repeat an
+    earlier payload byte-for-byte to model dashboard refreshes.
+    """
+    rng = random.Random(seed)
+    end = date.today() - timedelta(days=1)
+    mines = {
+        f"mine-{i:03d}": make_records(rng.choice(HISTORY_LENGTHS), rng, end)
+        for i in range(n_mines)
+    }
+
+    workload = []
+    for _ in range(n_requests):
+        if workload and rng.random() < repeat_ratio:
+            workload.append(rng.choice(workload))
+            continue
+
+        mine_id = rng.choice(list(mines))
+        if rng.random() < insights_ratio:
+            body = {"emissions": mines[mine_id][-120:], "forecast_data": [], "mine_id": mine_id}
+            endpoint = "/api/forecast/insights"
+        else:
+            body = {"emissions": mines[mine_id], "horizon": rng.choice(HORIZONS), "mine_id": mine_id}
+            endpoint = "/api/forecast"
+        workload.append((endpoint, json.dumps(body).encode()))
+    return workload
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_healthy(base_url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.3)
+    raise RuntimeError(f"Service at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+def start_server(workers: int, threads: int, port: int) -> subprocess.Popen:
+    """Launch gunicorn the same way the Dockerfile does, with the given sizing."""
+    service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [
+        sys.executable, "-m", "gunicorn",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--threads", str(threads),
+        "--timeout", "120",
+        "--log-level", "warning",
+        "app.main:create_app()",
+    ]
+    return subprocess.Popen(command, cwd=service_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def send(base_url: str, endpoint: str, body: bytes, timeout: float) -> tuple:
+    """Send one request; returns (latency seconds, HTTP status or 0 on failure)."""
+    req = urllib.request.Request(
+        f"{base_url}{endpoint}", data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, OSError, TimeoutError):
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Throughput, latency percentiles (ms) and error rate of (latency, status) samples."""
+    if not samples:
+        return {"requests": 0}
+    latencies = [latency * 1000 for latency, _ in samples]
+    errors = sum(1 for _, status in samples if status != 200)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(max(latencies), 1),
+        },
+    }
+
+
+def run_load(base_url: str, workload: list, concurrency: int, duration: float, timeout: float) -> dict:
+    """
+    Replay the workload with ``concurrency`` closed-loop clients.
+
+    Clients walk through the workload in order (wrapping around) until
+    ``duration`` seconds have elapsed, or once through if duration is 0.
+    """
+    samples = []
+    lock = threading.Lock()
+    cursor = {"next": 0}
+    start = time.perf_counter()
+
+    def next_item():
+        with lock:
+            i = cursor["next"]
+            if duration <= 0 and i >= len(workload):
+                return None
+            if duration > 0 and time.perf_counter() - start >= duration:
+                return None
+            cursor["next"] = i + 1
+            return workload[i % len(workload)]
+
+    def client():
+        while True:
+            item = next_item()
+            if item is None:
+                return
+            endpoint, body = item
+            latency, status = send(base_url, endpoint, body, timeout)
+            with lock:
+                samples.append((endpoint, latency, status))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - start
+
+    by_endpoint = {}
+    for endpoint, latency, status in samples:
+        by_endpoint.setdefault(endpoint, []).append((latency, status))
+
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "overall": summarize([(latency, status) for _, latency, status in samples], elapsed),
+        "endpoints": {endpoint: summarize(s, elapsed) for endpoint, s in sorted(by_endpoint.items())},
+    }
+
+
+def parse_configs(value: str) -> list:
+    """Parse '1x1,2x4' into [(1, 1), (2, 4)] (workers x threads)."""
+    configs = []
+    for item in value.split(","):
+        workers, _, threads = item.strip().partition("x")
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+
+def print_table(results: list):
+    header = f"{'config':<10}{'endpoint':<26}{'reqs':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>7}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        rows = [("all", result["overall"])] + list(result["endpoints"].items())
+        for endpoint, stats in rows:
+            if not stats.get("requests"):
+                continue
+            latency = stats["latency_ms"]
+            print(
+                f"{result['config']:<10}{endpoint:<26}{stats['requests']:>7}{stats['throughput_rps']:>9}"
+                f"{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}{stats['error_rate'] * 100:>7.1f}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the CoalNet ML service.")
+    parser.add_argument("--configs", default="1x1,2x1,2x4",
+                        help="Comma-separated gunicorn sizes as WORKERSxTHREADS (default: 1x1,2x1,2x4).")
+    parser.add_argument("--url", help="Target an already running service instead of starting gunicorn.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8).")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Seconds per configuration; 0 replays the workload once (default: 30).")
+    parser.add_argument("--requests", type=int, default=500, help="Distinct workload entries (default: 500).")
+    parser.add_argument("--mines", type=int, default=50, help="Number of simulated mines (default: 50).")
+    parser.add_argument("--insights-ratio", type=float, default=0.4, help="Share of insights requests.")
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="Share of repeated identical requests.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest-results.json", help="Where to write JSON results.")
+    args = parser.parse_args(argv)
+
+    print(f"Building workload: {args.requests} requests over {args.mines} mines...")
+    workload = build_workload(args.requests, args.mines, args.insights_ratio, args.repeat_ratio, args.seed)
+
+    targets = [("external", None)] if args.url else [(f"{w}x{t}", (w, t)) for w, t in parse_configs(args.configs)]
+    results = []
+    for label, sizing in targets:
+        server = None
+        base_url = args.url.rstrip("/") if args.url else None
+        try:
+            if sizing:
+                port = free_port()
+                base_url = f"http://127.0.0.1:{port}"
+                server = start_server(sizing[0], sizing[1], port)
+            wait_healthy(base_url)
+            print(f"Running {label} against {base_url} ...")
+            result = run_load(base_url, workload, args.concurrency, args.duration, args.timeout)
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+
+        result["config"] = label
+        if sizing:
+            result["workers"], result["threads"] = sizing
+        results.append(result)
+
+    print()
+    print_table(results)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from app.models.arima_model import ARIMAForecaster
+from app.models.arima_model import ARIMAForecaster, candidate_skip_reason, candidate_trend
 
 
 def generate_test_series(n=100, seed=42):
@@ -91,3 +91,118 @@ class TestARIMAForecaster:
         assert result["order"] is not None
         predictions = forecaster.predict(7)
         assert len(predictions["forecast"]) == 7
+
+    def test_fit_stats_reported(self):
+        series = generate_test_series()
+        forecaster = ARIMAForecaster()
+        forecaster.fit(series)
+        forecaster.evaluate()
+        stats = forecaster.get_fit_stats()
+        assert stats["fits"] > 0
+        assert stats["iterations"] > 0
+        assert stats["fit_time_ms"] > 0
+        assert stats["warm_started_fits"] == 0
+        # Evaluation starts from the full-data estimates
+        assert stats["evaluate"]["warm_started_fits"] == 1
+
+    def test_warm_start_from_previous_params(self):
+        series = generate_test_series(n=200)
+        cold = ARIMAForecaster()
+        cold.fit(series)
+
+        warm = ARIMAForecaster(start_params=cold.start_params)
+        warm.fit(series)
+        assert warm.order == cold.order
+        assert warm.aic == pytest.approx(cold.aic, rel=1e-4)
+        assert warm.get_fit_stats()["warm_started_fits"] > 0
+        assert warm.get_fit_stats()["iterations"] < cold.get_fit_stats()["iterations"]
+
+    def test_mismatched_start_params_ignored(self):
+        series = generate_test_series()
+        forecaster = ARIMAForecaster(
+            candidate_orders=[(1, 0, 0)], start_params={(1, 0, 0): [1.0, 2.0]}
+        )
+        result = forecaster.fit(series)
+        assert result["order"] == [1, 0, 0]
+        assert forecaster.get_fit_stats()["warm_started_fits"] == 0
+
+    def test_predict_multiple_levels(self):
+        series = generate_test_series()
+        forecaster = ARIMAForecaster()
+        forecaster.fit(series)
+        predictions = forecaster.predict(14, levels=[50, 80, 95])
+        intervals = predictions["intervals"]
+        assert list(intervals) == ["50", "80", "95"]
+        assert intervals["95"]["lower"] == predictions["confidence_lower"]
+        for i in range(14):
+            # Bands are nested around the point forecast
+            assert intervals["95"]["lower"][i] <= intervals["80"]["lower"][i] <= intervals["50"]["lower"][i]
+            assert intervals["50"]["lower"][i] <= predictions["forecast"][i] <= intervals["50"]["upper"][i]
+            assert intervals["50"]["upper"][i] <= intervals["80"]["upper"][i] <= intervals["95"]["upper"][i]
+
+    def test_predict_matches_conf_int(self):
+        series = generate_test_series()
+        forecaster = ARIMAForecaster()
+        forecaster.fit(series)
+        predictions = forecaster.predict(7, levels=[80])
+        conf_int = forecaster.fitted_model.get_forecast(steps=7).conf_int(alpha=0.2)
+        expected = [max(0, round(float(v), 2)) for v in conf_int.iloc[:, 0]]
+        assert predictions["intervals"]["80"]["lower"] == expected
+
+    def test_forecast_covariance_matches_se(self):
+        forecaster = ARIMAForecaster()
+        forecaster.fit(generate_test_series())
+        _, std_error = forecaster.forecast_distribution(10)
+        covariance = forecaster.forecast_covariance(10)
+        assert covariance.shape == (10, 10)
+        assert np.allclose(covariance, covariance.T)
+        assert np.allclose(np.diag(covariance), std_error ** 2)
+
+    def test_all_candidates_evaluated(self):
+        series = generate_test_series()
+        forecaster = ARIMAForecaster()
+        forecaster.fit(series)
+        diagnostics = forecaster.get_diagnostics()
+        # Every grid order gets a trend statsmodels accepts for its d
+        assert diagnostics["skipped_candidates"] == []
+        assert diagnostics["failed_candidates"] == []
+        assert forecaster.candidates_fitted == len(ARIMAForecaster.CANDIDATE_ORDERS)
+
+    def test_candidate_trend_survives_differencing(self):
+        values = generate_test_series().values
+        for order in ARIMAForecaster.CANDIDATE_ORDERS:
+            assert candidate_skip_reason(values, order, candidate_trend(order)) is None
+
+    def test_constant_series_uses_mean_model(self):
+        dates = pd.date_range(start="2025-01-01", periods=40, freq="D")
+        series = pd.Series(750.0, index=dates)
+        forecaster = ARIMAForecaster()
+        result = forecaster.fit(series)
+        assert result["order"] == [0, 0, 0]
+        assert forecaster.candidates_fitted == 0
+        assert forecaster.get_diagnostics()["used_fallback"] is True
+        assert all(c["reason"] == "constant series" for c in forecaster.skipped_candidates)
+        predictions = forecaster.predict(7)
+        assert predictions["forecast"] == [750.0] * 7
+
+
+class TestCandidateSkipReason:
+    """Tests for candidate_skip_reason pre-checks."""
+
+    def test_valid_candidate(self):
+        values = generate_test_series().to_numpy()
+        assert candidate_skip_reason(values, (2, 0, 1), "ct") is None
+        assert candidate_skip_reason(values, (1, 1, 1), "t") is None
+
+    def test_constant(self):
+        assert candidate_skip_reason(np.full(50, 3.0), (1, 0, 0), "ct") == "constant series"
+
+    def test_too_short_for_order(self):
+        values = generate_test_series(n=15).to_numpy()
+        reason = candidate_skip_reason(values, (2, 0, 1), "ct")
+        assert "need at least 16" in reason
+
+    def test_constant_after_differencing(self):
+        values = np.linspace(100, 200, 50)
+        reason = candidate_skip_reason(values, (1, 1, 1), "n")
+        assert reason == "series is constant after differencing 1 time(s)"
@@ -0,0 +1,129 @@
+"""Unit tests for the batched forecaster."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.main import create_app
+from app.models.batch_forecaster import BatchForecaster, batch_insights
+
+
+def generate_test_matrix(n_series=5, n=120, seed=42):
+    """Generate aligned synthetic emission series, one per row."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    rows = []
+    for i in range(n_series):
+        trend = np.linspace(1000 + 100 * i, 1200 + 100 * i, n)
+        seasonal = 50 * np.sin(2 * np.pi * t / 30 + i)
+        noise = rng.normal(0, 20, n)
+        rows.append(trend + seasonal + noise)
+    return np.vstack(rows)
+
+
+class TestBatchForecaster:
+    """Tests for BatchForecaster class."""
+
+    @pytest.mark.parametrize("method", ["ar", "ets"])
+    def test_predict_shapes(self, method):
+        data = generate_test_matrix()
+        forecaster = BatchForecaster(method=method)
+        forecaster.fit(data)
+        predictions = forecaster.predict(14)
+        for key in ("forecast", "confidence_lower", "confidence_upper"):
+            assert predictions[key].shape == (5, 14)
+
+    @pytest.mark.parametrize("method", ["ar", "ets"])
+    def test_confidence_interval_ordering(self, method):
+        data = generate_test_matrix()
+        forecaster = BatchForecaster(method=method)
+        forecaster.fit(data)
+        predictions = forecaster.predict(30)
+        assert (predictions["confidence_lower"] <= predictions["forecast"]).all()
+        assert (predictions["forecast"] <= predictions["confidence_upper"]).all()
+        # Intervals widen with the horizon
+        width = predictions["confidence_upper"] - predictions["confidence_lower"]
+        assert (np.diff(width, axis=1) >= -1e-9).all()
+
+    def test_ar_recovers_coefficients(self):
+        rng = np.random.default_rng(0)
+        n_series, n = 3, 2000
+        diff = np.zeros((n_series, n))
+        for t in range(1, n):
+            diff[:, t] = 0.6 * diff[:, t - 1] + rng.normal(0, 1, n_series)
+        data = 500 + np.cumsum(diff, axis=1)
+
+        forecaster = BatchForecaster(method="ar", max_lag=3)
+        forecaster.fit(data)
+        assert np.allclose(forecaster.coefs[:, 0], 0.6, atol=0.08)
+
+    def test_ar_matches_per_series_fit(self):
+        data = generate_test_matrix(n_series=4)
+        batch = BatchForecaster(method="ar", max_lag=5)
+        batch.fit(data)
+        batch_forecast = batch.predict(7)["forecast"]
+
+        for i in range(len(data)):
+            single = BatchForecaster(method="ar", max_lag=5)
+            single.fit(data[i:i + 1])
+            assert np.allclose(single.predict(7)["forecast"][0], batch_forecast[i])
+
+    def test_predict_without_fit_raises(self):
+        with pytest.raises(ValueError, match="not been fitted"):
+            BatchForecaster().predict(7)
+
+    def test_invalid_method(self):
+        with pytest.raises(ValueError, match="Method must be"):
+            BatchForecaster(method="lstm")
+
+    def test_rejects_nan(self):
+        data = generate_test_matrix()
+        data[0, 5] = np.nan
+        with pytest.raises(ValueError, match="NaN"):
+            BatchForecaster().fit(data)
+
+    def test_constant_series(self):
+        data = np.full((2, 60), 750.0)
+        forecaster = BatchForecaster(method="ar")
+        forecaster.fit(data)
+        predictions = forecaster.predict(7)
+        assert np.allclose(predictions["forecast"], 750.0)
+
+
+class TestBatchInsights:
+    """Tests for batch_insights."""
+
+    def test_matches_pandas_rolling(self):
+        data = generate_test_matrix(n_series=3, n=60)
+        stats = batch_insights(data)
+        for i in range(len(data)):
+            series = pd.Series(data[i])
+            mean = series.rolling(window=7, min_periods=3).mean().to_numpy()
+            std = series.rolling(window=7, min_periods=3).std().to_numpy()
+            assert np.allclose(stats["rolling_mean"][i], mean, equal_nan=True)
+            assert np.allclose(stats["rolling_std"][i], std, equal_nan=True)
+
+    def test_trend_slope_matches_polyfit(self):
+        data = generate_test_matrix(n_series=3, n=60)
+        stats = batch_insights(data)
+        for i in range(len(data)):
+            recent = data[i, -30:]
+            slope = np.polyfit(np.arange(30), recent, 1)[0]
+            assert stats["trend_slope"][i] == pytest.approx(slope)
+
+    def test_detects_spike(self):
+        data = generate_test_matrix(n_series=2, n=60)
+        data[1, 40] += 1000
+        stats = batch_insights(data)
+        assert stats["anomalies"][1, 40]
+        assert not stats["anomalies"][0, 40]
+
+
+class TestBatchEndpoint:
+    """Request validation for POST /api/forecast/batch."""
+
+    def test_non_dict_record_is_rejected(self):
+        client = create_app().test_client()
+        response = client.post("/api/forecast/batch", json={"mines": {"a": [5]}})
+        assert response.status_code == 400
+        assert "must contain" in response.get_json()["error"]
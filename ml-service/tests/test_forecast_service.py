@@ -4,8 +4,11 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from app.services.forecast_service import generate_forecast
+from app.services.forecast_service import (
+    generate_forecast, generate_batch_forecast, order_history, weekly_order_history,
+)
 from app.services.data_processor import process_emission_data, validate_minimum_data
+from app.services.insights_service import compute_insights
 
 
 def make_emission_records(n=90, start_date="2025-01-01"):
@@ -107,6 +110,31 @@ class TestForecastService:
         assert "upper_bound" in entry
         assert "lower_bound" in entry
 
+    def test_forecast_levels(self):
+        records = make_emission_records(90)
+        result = generate_forecast(records, horizon=7, levels=[50, 80])
+        assert list(result["intervals"]) == ["50", "80"]
+        assert len(result["intervals"]["80"]["upper"]) == 7
+
+    def test_forecast_without_levels_has_no_intervals(self):
+        result = generate_forecast(make_emission_records(90), horizon=7)
+        assert "intervals" not in result
+
+    def test_forecast_diagnostics(self):
+        result = generate_forecast(make_emission_records(90), horizon=7)
+        diagnostics = result["diagnostics"]
+        assert diagnostics["skipped_candidates"] == []
+        assert diagnostics["failed_candidates"] == []
+        assert diagnostics["used_fallback"] is False
+
+    def test_forecast_constant_series(self):
+        records = make_emission_records(40)
+        for record in records:
+            record["total_carbon_emission"] = 1000.0
+        result = generate_forecast(records, horizon=7)
+        assert result["diagnostics"]["used_fallback"] is True
+        assert result["forecast_data"][0]["predicted"] == 1000.0
+
     def test_invalid_horizon(self):
         records = make_emission_records(90)
         with pytest.raises(ValueError, match="Horizon must be"):
@@ -116,3 +144,148 @@ class TestForecastService:
         records = make_emission_records(10)
         with pytest.raises(ValueError, match="Insufficient data"):
             generate_forecast(records, horizon=7)
+
+
+class TestBatchForecastService:
+    """Tests for the batched forecasting pipeline."""
+
+    def test_generate_batch_forecast(self):
+        mines = {
+            "mine_a": make_emission_records(90),
+            "mine_b": make_emission_records(121, start_date="2024-12-01"),
+        }
+        result = generate_batch_forecast(mines, horizon=14)
+        assert set(result["forecasts"]) == {"mine_a", "mine_b"}
+        assert result["errors"] == {}
+        assert result["forecasts"]["mine_a"]["data_points_used"] == 90
+        assert result["forecasts"]["mine_b"]["data_points_used"] == 121
+        for forecast in result["forecasts"].values():
+            assert len(forecast["forecast_data"]) == 14
+            entry = forecast["forecast_data"][0]
+            assert entry["date"] == "2025-04-01"
+            assert entry["lower_bound"] <= entry["predicted"] <= entry["upper_bound"]
+
+    def test_short_mine_does_not_shrink_others(self):
+        mines = {
+            "mine_a": make_emission_records(90),
+            "mine_b": make_emission_records(90),
+            "short": make_emission_records(10, start_date="2025-03-22"),
+        }
+        result = generate_batch_forecast(mines, horizon=7)
+        assert set(result["forecasts"]) == {"mine_a", "mine_b"}
+        assert "30 data points" in result["errors"]["short"]
+        assert result["forecasts"]["mine_a"]["data_points_used"] == 90
+        alone = generate_batch_forecast({"mine_a": make_emission_records(90)}, horizon=7)
+        assert result["forecasts"]["mine_a"] == alone["forecasts"]["mine_a"]
+
+    def test_stale_mine_reported(self):
+        mines = {
+            "mine_a": make_emission_records(90),
+            "stale": make_emission_records(80),
+        }
+        result = generate_batch_forecast(mines, horizon=7)
+        assert set(result["forecasts"]) == {"mine_a"}
+        assert "before the batch end date 2025-03-31" in result["errors"]["stale"]
+
+    def test_batch_anomalies_match_insights(self):
+        records = make_emission_records(90)
+        records[60]["total_carbon_emission"] *= 3
+        result = generate_batch_forecast({"mine_a": records}, horizon=7)
+        expected = compute_insights(records, [])["anomalies"]
+        assert result["forecasts"]["mine_a"]["anomalies"] == expected
+
+    def test_batch_without_usable_mine(self):
+        mines = {
+            "mine_a": make_emission_records(20),
+            "mine_b": make_emission_records(25),
+        }
+        with pytest.raises(ValueError, match="No mine has enough history"):
+            generate_batch_forecast(mines, horizon=7)
+
+
+class TestOrderWarmStart:
+    """Forecasts for a known series reuse its previous order."""
+
+    def setup_method(self):
+        order_history.clear()
+
+    def test_second_forecast_uses_warm_search(self):
+        records = make_emission_records(90)
+        first = generate_forecast(records, horizon=7, series_id="mine_a")
+        second = generate_forecast(records, horizon=7, series_id="mine_a")
+        assert first["model_params"]["search"]["mode"] == "full"
+        assert second["model_params"]["search"]["mode"] == "warm"
+        assert second["model_params"]["search"]["candidates_fitted"] < first["model_params"]["search"]["candidates_fitted"]
+        assert second["model_params"]["order"] == first["model_params"]["order"]
+        assert first["model_params"]["optimizer"]["warm_started_fits"] == 0
+        assert second["model_params"]["optimizer"]["warm_started_fits"] > 0
+        assert order_history.stats()["fits_avoided"] > 0
+
+    def test_without_series_id_no_history(self):
+        generate_forecast(make_emission_records(90), horizon=7)
+        assert order_history.stats()["searches"] == 0
+
+
+class TestHistoryPolicy:
+    """Tests for lookback and hierarchical history policies."""
+
+    def test_default_is_full_history(self):
+        result = generate_forecast(make_emission_records(90), horizon=7)
+        assert result["history"]["mode"] == "full"
+        assert result["history"]["points_used"] == 90
+
+    def test_lookback_limits_fit_window(self):
+        records = make_emission_records(400, start_date="2024-01-01")
+        result = generate_forecast(records, horizon=7, history_policy={"mode": "lookback", "max_lookback_days": 120})
+        assert result["history"]["points_available"] == 400
+        assert result["history"]["points_used"] == 120
+        assert result["data_points_used"] == 120
+        assert result["forecast_data"][0]["date"] == "2025-02-04"
+
+    def test_hierarchical_reconciles_weekly_model(self):
+        records = make_emission_records(400, start_date="2024-01-01")
+        result = generate_forecast(
+            records, horizon=14,
+            history_policy={"mode": "hierarchical", "max_lookback_days": 400, "recent_days": 90},
+        )
+        history = result["history"]
+        assert history["points_used"] == 90
+        assert history["reconciliation"] == "applied"
+        assert 0 < history["mean_weekly_weight"] <= 1
+        assert history["accuracy_basis"].startswith("daily model")
+        assert len(result["forecast_data"]) == 14
+
+    def test_hierarchical_weekly_searches_tracked_separately(self):
+        order_history.clear()
+        weekly_order_history.clear()
+        records = make_emission_records(400, start_date="2024-01-01")
+        generate_forecast(
+            records, horizon=7, series_id="mine_h",
+            history_policy={"mode": "hierarchical", "max_lookback_days": 400, "recent_days": 90},
+        )
+        assert order_history.stats()["searches"] == 1
+        assert list(order_history.stats()["series"]) == ["mine_h"]
+        assert weekly_order_history.stats()["searches"] == 1
+
+    def test_hierarchical_short_history_skips_weekly(self):
+        result = generate_forecast(make_emission_records(90), horizon=7, history_policy={"mode": "hierarchical"})
+        assert result["history"]["reconciliation"].startswith("skipped")
+
+    def test_compare_reports_backtest(self):
+        records = make_emission_records(200, start_date="2024-06-01")
+        result = generate_forecast(
+            records, horizon=7,
+            history_policy={"mode": "lookback", "max_lookback_days": 60, "compare": True},
+        )
+        backtest = result["history"]["backtest"]
+        assert backtest["holdout_days"] == 7
+        assert backtest["policy"]["points_used"] == 60
+        assert backtest["full_history"]["points_used"] == 193
+        assert backtest["policy"]["mae"] >= 0
+
+    def test_invalid_policy(self):
+        records = make_emission_records(90)
+        with pytest.raises(ValueError, match="History mode"):
+            generate_forecast(records, horizon=7, history_policy={"mode": "monthly"})
+        with pytest.raises(ValueError, match="at least 30"):
+            generate_forecast(records, horizon=7, history_policy={"mode": "lookback", "max_lookback_days": 10})
@@ -0,0 +1,133 @@
+"""Tests for the insights service and its incremental engine."""
+
+from app.services.insights_service import compute_insights, IncrementalInsights
+from tests.test_forecast_service import make_emission_records
+
+
+def make_spiky_records(n=150):
+    """Emission records with a few injected spikes so anomalies exist."""
+    records = make_emission_records(n)
+    for i in (20, 50, 51, 90, 140):
+        if i < n:
+            records[i]["total_carbon_emission"] = round(records[i]["total_carbon_emission"] * 1.6, 2)
+    return records
+
+
+def assert_same_insights(actual, expected):
+    """The incremental engine must reproduce a full recompute exactly."""
+    assert actual == expected
+
+
+class TestComputeInsights:
+    """Tests for the full-recompute path."""
+
+    def test_structure(self):
+        result = compute_insights(make_spiky_records(), [])
+        assert set(result) == {"anomalies", "seasonality", "drivers", "trend", "mape"}
+        assert len(result["seasonality"]["weekday_data"]) == 7
+        assert result["mape"] is None
+
+    def test_detects_spikes(self):
+        result = compute_insights(make_spiky_records(), [])
+        dates = [a["date"] for a in result["anomalies"]]
+        assert "2025-01-21" in dates
+
+    def test_mape_with_forecast(self):
+        result = compute_insights(make_spiky_records(), [{"date": "2025-06-01", "predicted": 1.0}])
+        assert result["mape"] is not None
+
+
+class TestIncrementalInsights:
+    """The incremental engine must match a full recompute."""
+
+    def test_first_call_matches_full(self):
+        records = make_spiky_records()
+        engine = IncrementalInsights()
+        assert_same_insights(engine.get_insights("m1", records, []), compute_insights(records, []))
+
+    def test_appended_days(self):
+        records = make_spiky_records(150)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[:100], [])
+        for end in (101, 120, 150):
+            forecast_data = [{"date": "2025-06-01"}]
+            result = engine.get_insights("m1", records[:end], forecast_data)
+            assert_same_insights(result, compute_insights(records[:end], forecast_data))
+
+    def test_sliding_window(self):
+        records = make_spiky_records(150)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[0:120], [])
+        for start, end in ((1, 121), (5, 130), (30, 150), (48, 150)):
+            window = records[start:end]
+            assert_same_insights(engine.get_insights("m1", window, []), compute_insights(window, []))
+
+    def test_long_sliding_replay(self):
+        records = make_spiky_records(600)
+        engine = IncrementalInsights()
+        for start in range(0, 480, 3):
+            window = records[start:start + 120]
+            assert_same_insights(engine.get_insights("m1", window, []), compute_insights(window, []))
+
+    def test_short_window_eviction(self):
+        records = make_spiky_records(60)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[0:20], [])
+        window = records[4:26]
+        assert_same_insights(engine.get_insights("m1", window, []), compute_insights(window, []))
+
+    def test_edited_history_rebuilds(self):
+        records = make_spiky_records(100)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[:90], [])
+        edited = [dict(r) for r in records]
+        edited[89]["date"] = "2025-03-31T12:00:00.000Z"
+        assert_same_insights(engine.get_insights("m1", edited, []), compute_insights(edited, []))
+
+    def test_edited_values_rebuild(self):
+        records = make_spiky_records(100)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[:90], [])
+        edited = [dict(r) for r in records[:90]]
+        edited[60]["total_carbon_emission"] *= 3
+        edited[89]["fuel_emission"] += 500000
+        assert_same_insights(engine.get_insights("m1", edited, []), compute_insights(edited, []))
+
+    def test_last_day_updated_in_place(self):
+        records = make_spiky_records(100)
+        engine = IncrementalInsights()
+        engine.get_insights("m1", records[:90], [])
+        updated = [dict(r) for r in records[:91]]
+        updated[89]["total_carbon_emission"] += 20000
+        updated[89]["transport_emission"] += 20000
+        assert_same_insights(engine.get_insights("m1", updated, []), compute_insights(updated, []))
+
+    def test_unparseable_dates_skipped(self):
+        records = [dict(r) for r in make_spiky_records(60)]
+        records[10]["date"] = "not a date"
+        engine = IncrementalInsights()
+        assert_same_insights(engine.get_insights("m1", records, []), compute_insights(records, []))
+
+    def test_mines_are_independent(self):
+        records_a = make_spiky_records(100)
+        records_b = make_emission_records(80, start_date="2024-06-01")
+        engine = IncrementalInsights()
+        engine.get_insights("a", records_a[:90], [])
+        engine.get_insights("b", records_b, [])
+        assert_same_insights(engine.get_insights("a", records_a, []), compute_insights(records_a, []))
+
+    def test_mines_do_not_share_a_lock(self):
+        engine = IncrementalInsights()
+        records = make_emission_records(30)
+        engine.get_insights("a", records, [])
+        # A request for another mine proceeds while mine "a" is busy
+        with engine._states["a"].lock:
+            result = engine.get_insights("b", records, [])
+        assert_same_insights(result, compute_insights(records, []))
+
+    def test_lru_bound(self):
+        engine = IncrementalInsights(max_mines=2)
+        records = make_emission_records(30)
+        for mine_id in ("a", "b", "c"):
+            engine.get_insights(mine_id, records, [])
+        assert list(engine._states) == ["b", "c"]
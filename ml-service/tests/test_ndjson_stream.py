@@ -0,0 +1,151 @@
+"""Tests for streaming NDJSON ingestion."""
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.main import create_app
+from app.services.data_processor import process_emission_data
+from app.services.insights_service import IncrementalInsights, compute_insights
+from app.utils.ndjson_stream import _MAX_INITIAL_CAPACITY, EmissionColumns, is_ndjson, read_emission_stream
+from app.utils.validators import validate_forecast_params
+from tests.test_forecast_service import make_emission_records
+
+NDJSON = "application/x-ndjson"
+
+
+def to_ndjson(records, params=None) -> bytes:
+    lines = [json.dumps({"params": params})] if params is not None else []
+    lines.extend(json.dumps(record) for record in records)
+    return ("\n".join(lines) + "\n").encode()
+
+
+class TestReadEmissionStream:
+    """Tests for read_emission_stream and EmissionColumns."""
+
+    def test_parses_records_and_params(self):
+        records = make_emission_records(30)
+        body = to_ndjson(records, params={"horizon": 14, "mine_id": "m1"})
+
+        data = read_emission_stream(io.BytesIO(body), validate_params=validate_forecast_params)
+        assert data["horizon"] == 14
+        assert data["mine_id"] == "m1"
+        assert len(data["emissions"]) == 30
+        assert data["emissions"][0]["date"] == records[0]["date"]
+        assert data["emissions"][-1]["total_carbon_emission"] == pytest.approx(records[-1]["total_carbon_emission"])
+
+    def test_params_line_is_optional(self):
+        data = read_emission_stream(io.BytesIO(to_ndjson(make_emission_records(10))))
+        assert set(data) == {"emissions"}
+        assert len(data["emissions"]) == 10
+
+    def test_buffers_grow_past_initial_capacity(self):
+        columns = EmissionColumns(capacity=4)
+        records = make_emission_records(50)
+        for record in records:
+            columns.append(record)
+        assert len(columns) == 50
+        np.testing.assert_allclose(
+            columns.to_frame()["total_carbon_emission"],
+            [r["total_carbon_emission"] for r in records],
+        )
+
+    def test_claimed_length_does_not_drive_allocation(self):
+        records = make_emission_records(10)
+        data = read_emission_stream(io.BytesIO(to_ndjson(records)), content_length=750 * 1024 * 1024)
+        columns = data["emissions"]
+        assert len(columns) == 10
+        assert len(columns.totals) <= _MAX_INITIAL_CAPACITY
+
+    def test_matches_json_list_processing(self):
+        records = make_emission_records(60)
+        columns = read_emission_stream(io.BytesIO(to_ndjson(records)))["emissions"]
+
+        np.testing.assert_allclose(process_emission_data(columns), process_emission_data(records))
+        assert compute_insights(columns, []) == compute_insights(records, [])
+
+    def test_incremental_insights_use_columns(self, monkeypatch):
+        records = make_emission_records(150)
+        engine = IncrementalInsights()
+
+        def no_dicts(self, i):
+            raise AssertionError("per-record dict materialized")
+
+        monkeypatch.setattr(EmissionColumns, "_record", no_dicts)
+        for start, end in ((0, 120), (3, 123), (30, 150)):
+            columns = read_emission_stream(io.BytesIO(to_ndjson(records[start:end])))["emissions"]
+            result = engine.get_insights("m1", columns, [])
+            monkeypatch.undo()
+            assert result == compute_insights(records[start:end], [])
+            monkeypatch.setattr(EmissionColumns, "_record", no_dicts)
+
+    def test_bad_record_rejected_with_line_number(self):
+        records = make_emission_records(10)
+        records[4] = {"date": records[4]["date"], "total_carbon_emission": "high"}
+        with pytest.raises(ValueError, match="Line 6"):
+            read_emission_stream(io.BytesIO(to_ndjson(records, params={"horizon": 7})))
+
+    def test_invalid_json_rejected(self):
+        body = to_ndjson(make_emission_records(3)) + b"{not json\n"
+        with pytest.raises(ValueError, match="Line 4: invalid JSON"):
+            read_emission_stream(io.BytesIO(body))
+
+    def test_params_validated_before_records(self):
+        class Stream:
+            """Fails if read past the params line."""
+            def __iter__(self):
+                yield json.dumps({"params": {"horizon": 5}}).encode()
+                raise AssertionError("records read after invalid params")
+
+        with pytest.raises(ValueError, match="Horizon"):
+            read_emission_stream(Stream(), validate_params=validate_forecast_params)
+
+    def test_empty_upload_rejected(self):
+        with pytest.raises(ValueError, match="No emission records"):
+            read_emission_stream(io.BytesIO(to_ndjson([], params={"horizon": 7})))
+
+    def test_is_ndjson(self):
+        assert is_ndjson("application/x-ndjson")
+        assert is_ndjson("application/x-ndjson; charset=utf-8")
+        assert not is_ndjson("application/json")
+        assert not is_ndjson(None)
+
+
+class TestNdjsonEndpoints:
+    """NDJSON uploads through the forecast and insights routes."""
+
+    @pytest.fixture
+    def client(self):
+        return create_app().test_client()
+
+    def test_forecast_accepts_ndjson(self, client):
+        body = to_ndjson(make_emission_records(90), params={"horizon": 7})
+        response = client.post("/api/forecast", data=body, content_type=NDJSON)
+        assert response.status_code == 200
+        payload = response.get_json()
+        assert payload["success"] is True
+        assert len(payload["forecast_data"]) == 7
+        assert payload["data_points_used"] == 90
+
+    def test_forecast_rejects_bad_line(self, client):
+        records = make_emission_records(90)
+        del records[10]["total_carbon_emission"]
+        response = client.post("/api/forecast", data=to_ndjson(records), content_type=NDJSON)
+        assert response.status_code == 400
+        assert "Line 11" in response.get_json()["error"]
+
+    def test_insights_accepts_ndjson(self, client):
+        records = make_emission_records(60)
+        response = client.post(
+            "/api/forecast/insights", data=to_ndjson(records, params={"forecast_data": []}), content_type=NDJSON
+        )
+        assert response.status_code == 200
+        expected = client.post("/api/forecast/insights", json={"emissions": records, "forecast_data": []})
+        assert response.get_json() == expected.get_json()
+
+    def test_insights_rejects_bad_line(self, client):
+        response = client.post("/api/forecast/insights", data=b'{"date": 1}\n', content_type=NDJSON)
+        assert response.status_code == 400
+        assert response.get_json()["error"].startswith("Line 1")
@@ -0,0 +1,76 @@
+"""Unit tests for the per-series order history."""
+
+import os
+import subprocess
+import sys
+
+from app.models.arima_model import ARIMAForecaster
+from app.services.order_history import OrderHistory
+
+GRID = ARIMAForecaster.CANDIDATE_ORDERS
+
+
+class TestOrderHistory:
+    """Tests for OrderHistory."""
+
+    def test_unknown_series_gets_full_grid(self):
+        history = OrderHistory()
+        candidates, mode = history.candidates_for("m1", GRID)
+        assert mode == "full"
+        assert candidates == list(GRID)
+
+    def test_warm_search_tries_previous_winner_first(self):
+        history = OrderHistory()
+        history.record("m1", (1, 1, 1), "full", len(GRID), len(GRID))
+        candidates, mode = history.candidates_for("m1", GRID)
+        assert mode == "warm"
+        assert candidates[0] == (1, 1, 1)
+        assert (2, 1, 1) in candidates and (1, 1, 0) in candidates
+        assert all(order[1] == 1 for order in candidates)
+        assert len(candidates) < len(GRID)
+
+    def test_periodic_full_search(self):
+        history = OrderHistory(full_search_interval=3)
+        history.record("m1", (1, 1, 1), "full", 10, 10)
+        modes = []
+        for _ in range(6):
+            candidates, mode = history.candidates_for("m1", GRID)
+            modes.append(mode)
+            history.record("m1", (1, 1, 1), mode, len(candidates), 10)
+        assert modes == ["warm", "warm", "full", "warm", "warm", "full"]
+
+    def test_stats(self):
+        history = OrderHistory()
+        history.record("m1", (1, 1, 1), "full", 10, 10)
+        history.record("m1", (1, 1, 1), "warm", 4, 10)
+        history.record("m1", (2, 1, 1), "warm", 4, 10)
+        stats = history.stats()
+        assert stats["searches"] == 3
+        assert stats["warm_searches"] == 2
+        assert stats["fits_performed"] == 18
+        assert stats["fits_avoided"] == 12
+        assert stats["order_repeats"] == 1
+        assert stats["order_changes"] == 1
+        assert stats["order_stability"] == 0.5
+        assert stats["series"]["m1"]["last_order"] == [2, 1, 1]
+
+    def test_series_bound(self):
+        history = OrderHistory(max_series=2)
+        for series_id in ("a", "b", "c"):
+            history.record(series_id, (1, 1, 1), "full", 10, 10)
+        assert set(history.stats()["series"]) == {"b", "c"}
+
+
+def test_interval_read_from_dotenv():
+    """main.py must load .env before the services read ORDER_FULL_SEARCH_INTERVAL."""
+    code = (
+        "import os, dotenv\n"
+        "dotenv.load_dotenv = lambda *a, **k: os.environ.update(ORDER_FULL_SEARCH_INTERVAL='3')\n"
+        "import app.main\n"
+        "from app.services.forecast_service import order_history\n"
+        "print(order_history.full_search_interval)\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "ORDER_FULL_SEARCH_INTERVAL"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "3"
@@ -0,0 +1,72 @@
+"""Tests for the on-demand request profiler."""
+
+import os
+
+from flask import Flask, jsonify
+
+from app.main import create_app
+from app.utils.profiler import ProfileStore, profiled
+
+
+def make_profiled_app(store):
+    """Minimal Flask app with one profiled view."""
+    app = Flask(__name__)
+
+    @app.route("/work", methods=["POST"])
+    @profiled("work", store=store)
+    def work():
+        total = sum(i * i for i in range(10000))
+        return jsonify({"total": total})
+
+    return app
+
+
+class TestProfiler:
+    """Tests for the profiled decorator and ProfileStore."""
+
+    def test_disabled_returns_original_function(self):
+        def view():
+            return "ok"
+
+        assert profiled("view", store=ProfileStore(enabled=False))(view) is view
+
+    def test_header_triggers_profile(self):
+        store = ProfileStore(enabled=True)
+        client = make_profiled_app(store).test_client()
+
+        response = client.post("/work", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+
+        entry = store.get(profile_id)
+        assert entry["endpoint"] == "work"
+        assert entry["trigger"] == "header"
+        assert entry["status_code"] == 200
+        assert "cumulative" in entry["stats"]
+        assert response.headers["X-Profile-Worker"] == str(os.getpid())
+        assert entry["worker_pid"] == os.getpid()
+
+    def test_no_header_no_profile(self):
+        store = ProfileStore(enabled=True)
+        client = make_profiled_app(store).test_client()
+        response = client.post("/work")
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+        assert store.list() == []
+
+    def test_sampling(self):
+        store = ProfileStore(enabled=True, sample_rate=1.0)
+        client = make_profiled_app(store).test_client()
+        client.post("/work")
+        assert store.list()[0]["trigger"] == "sample"
+
+    def test_ring_is_bounded(self):
+        store = ProfileStore(enabled=True, size=3)
+        client = make_profiled_app(store).test_client()
+        ids = [client.post("/work", headers={"X-Profile": "1"}).headers["X-Profile-Id"] for _ in range(5)]
+        assert [p["id"] for p in store.list()] == ids[:1:-1]
+        assert "stats" not in store.list()[0]
+
+    def test_debug_endpoint_disabled_by_default(self):
+        client = create_app().test_client()
+        assert client.get("/debug/profiles").status_code == 404
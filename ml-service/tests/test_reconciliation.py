@@ -0,0 +1,73 @@
+"""Unit tests for weekly/daily forecast reconciliation."""
+
+import numpy as np
+import pandas as pd
+
+from app.models.reconciliation import reconcile_weekly, to_weekly, weeks_ahead
+
+
+class TestReconciliation:
+    """Tests for the reconciliation helpers."""
+
+    def test_to_weekly_means(self):
+        dates = pd.date_range(start="2025-01-06", periods=14, freq="D")  # Monday
+        series = pd.Series([1.0] * 7 + [3.0] * 7, index=dates)
+        weekly = to_weekly(series)
+        assert weekly.tolist() == [1.0, 3.0]
+        assert all(d.weekday() == 6 for d in weekly.index)
+
+    def test_to_weekly_drops_partial_weeks(self):
+        # Wednesday to Monday: partial weeks at both ends
+        dates = pd.date_range(start="2025-01-01", periods=20, freq="D")
+        values = [40.0 if d.weekday() >= 5 else 100.0 for d in dates]
+        weekly = to_weekly(pd.Series(values, index=dates))
+        assert weekly.index.tolist() == [pd.Timestamp("2025-01-12"), pd.Timestamp("2025-01-19")]
+        assert np.allclose(weekly, 580.0 / 7)
+
+    def test_weeks_ahead(self):
+        last_week_end = pd.Timestamp("2025-01-12")  # Sunday
+        dates = pd.date_range(start="2025-01-10", periods=10, freq="D")  # Friday
+        steps = weeks_ahead(dates, last_week_end)
+        assert steps.tolist() == [0, 0, 0, 1, 1, 1, 1, 1, 1, 1]
+
+    def test_reconcile_moves_toward_weekly(self):
+        daily_mean = np.full(7, 100.0)
+        # Perfectly correlated daily errors: the week mean has variance 100
+        daily_cov = np.full((7, 7), 100.0)
+        steps = np.ones(7, dtype=int)
+        mean, weights = reconcile_weekly(daily_mean, daily_cov, steps, np.array([120.0]), np.array([10.0]))
+        # Equal variances: halfway between the two models
+        assert np.allclose(mean, 110.0)
+        assert np.allclose(weights, 0.5)
+
+    def test_uses_variance_of_week_mean(self):
+        # Independent daily errors: averaging 7 days divides the variance by 7
+        daily_cov = np.eye(7) * 100.0
+        _, weights = reconcile_weekly(
+            np.full(7, 100.0), daily_cov, np.ones(7, dtype=int), np.array([120.0]), np.array([10.0]),
+        )
+        assert np.allclose(weights, (100.0 / 7) / (100.0 / 7 + 100.0))
+
+    def test_reconcile_preserves_daily_shape(self):
+        daily_mean = np.array([90.0, 110.0, 100.0, 95.0, 105.0, 100.0, 100.0])
+        daily_cov = np.full((7, 7), 400.0)
+        steps = np.ones(7, dtype=int)
+        mean, _ = reconcile_weekly(daily_mean, daily_cov, steps, np.array([200.0]), np.array([1e-6]))
+        assert np.allclose(mean - daily_mean, 100.0)
+
+    def test_observed_week_unchanged(self):
+        daily_mean = np.full(4, 100.0)
+        steps = np.array([0, 0, 1, 1])
+        mean, weights = reconcile_weekly(daily_mean, np.full((4, 4), 25.0), steps, np.array([150.0]), np.array([5.0]))
+        assert mean[:2].tolist() == [100.0, 100.0]
+        assert weights[:2].tolist() == [0.0, 0.0]
+
+    def test_observed_days_count_toward_first_week(self):
+        # Monday-Thursday observed at 100; Friday, Saturday, Sunday forecast
+        daily_mean = np.array([100.0, 40.0, 40.0])
+        mean, _ = reconcile_weekly(
+            daily_mean, np.full((3, 3), 100.0), np.ones(3, dtype=int),
+            np.array([580.0 / 7]), np.array([1e-6]), observed=np.full(4, 100.0),
+        )
+        # The daily model already matches the weekly mean, so nothing moves
+        assert np.allclose(mean, daily_mean)